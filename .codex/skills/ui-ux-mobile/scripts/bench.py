@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Mobile Bench - timing harness for index builds on large synthetic datasets
+Usage: python bench.py build [--rows <n>] [--workers <n,n,...>] [--chunk-rows <n>] [--memory]
+       python bench.py score [--rows <n>] [--workers <n,n,...>] [--repeat <n>]
+       python bench.py check
+
+The synthetic dataset repeats the rows of every stack CSV, tagging each copy with
+unique terms so the vocabulary keeps growing like a real guideline export.
+
+`check` confirms streaming ingestion reads the same records as the csv module,
+on the bundled CSVs and on the quoting edge cases in INGEST_CASES.
+
+Sharded scoring only scales on free-threaded builds (python3.14t); under the GIL
+the score table shows the cost of sharding instead. Run it on both to compare.
+"""
+
+import argparse
+import csv
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core import (DATA_DIR, FREE_THREADED, STACK_CONFIG, _STACK_COLS, _CsvIndex, _parse_record, _split_record,
+                  build_index, iter_csv_records)
+
+# Queries for the score benchmark: common, rare and multi-term
+SCORE_QUERIES = ["navigation", "glass effect button", "state management list", "accessibility label", "variant42 team7"]
+
+# CSV inputs that streaming ingestion must split into records exactly like csv.reader
+INGEST_CASES = {
+    "stray quote in unquoted field": b'Pattern,Platform\nPhone 6.1" screen,iOS\nTablet,Android\nFold,Android\n',
+    "multi-line quoted field": b'Pattern,Notes\nSheet,"Drag down\nto dismiss"\nTabs,Bottom\n',
+    "escaped quotes across lines": b'Pattern,Notes\nLabel,"Say ""Done""\nnot ""OK"""\nFab,One\n',
+    "text after closing quote": b'Pattern,Notes\n"Card" view,"a,b"\nList,c\n',
+    "crlf and no final newline": b'Pattern,Notes\r\nChip,"x\r\ny"\r\nMenu,z',
+}
+
+
+def make_dataset(path, rows):
+    """Write a synthetic stack-style CSV with `rows` data rows"""
+    source = []
+    for config in STACK_CONFIG.values():
+        with open(DATA_DIR / config["file"], 'r', encoding='utf-8') as f:
+            source.extend(csv.DictReader(f))
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=_STACK_COLS["output_cols"], extrasaction='ignore')
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(source[i % len(source)])
+            row["Guideline"] = f"{row['Guideline']} variant{i % 5000} team{i % 97}"
+            writer.writerow(row)
+
+
+def worker_counts(spec):
+    """Parse --workers, defaulting to powers of two up to the core count"""
+    if spec:
+        return [int(n) for n in spec.split(",")]
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def traced_peak_mb(build):
+    """Peak Python heap of the calling process while running build()"""
+    tracemalloc.start()
+    try:
+        build()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_build(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.csv"
+        make_dataset(path, args.rows)
+        size_mb = path.stat().st_size / 1024 / 1024
+        print(f"## Index build: {args.rows} rows, {size_mb:.1f} MB, {os.cpu_count()} cores\n")
+        print("| Workers | Build (s) | Rows/s | Speedup |")
+        print("|---------|-----------|--------|---------|")
+
+        baseline = None
+        for workers in worker_counts(args.workers):
+            started = time.perf_counter()
+            index = build_index(path, _STACK_COLS["search_cols"], workers, args.chunk_rows)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"| {workers} | {elapsed:.2f} | {index.bm25.N / elapsed:,.0f} | {baseline / elapsed:.2f}x |")
+            del index
+
+        if args.memory:
+            streaming = traced_peak_mb(lambda: build_index(path, _STACK_COLS["search_cols"], 1, args.chunk_rows))
+            in_process = traced_peak_mb(lambda: _CsvIndex(path, _STACK_COLS["search_cols"]))
+            print(f"\nPeak heap (main process): chunked {streaming:.1f} MB, whole-file tokenization {in_process:.1f} MB")
+
+
+def bench_score(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic.csv"
+        make_dataset(path, args.rows)
+        index = build_index(path, _STACK_COLS["search_cols"], os.cpu_count() or 1)
+
+    bm25 = index.bm25
+    build = "free-threaded" if FREE_THREADED else "GIL"
+    print(f"## Sharded scoring: {bm25.N} rows, {os.cpu_count()} cores, Python {platform.python_version()} ({build})\n")
+    print("| Workers | ms/query | Queries/s | Speedup |")
+    print("|---------|----------|-----------|---------|")
+
+    expected = [bm25.top(query, 10) for query in SCORE_QUERIES]
+    baseline = None
+    for workers in worker_counts(args.workers):
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            # Warm up the pool threads, and check shards merge to the serial ranking
+            if [bm25.top(query, 10, None, pool, workers) for query in SCORE_QUERIES] != expected:
+                raise SystemExit(f"sharded ranking with {workers} workers differs from serial")
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                for query in SCORE_QUERIES:
+                    bm25.top(query, 10, None, pool, workers)
+            elapsed = (time.perf_counter() - started) / (args.repeat * len(SCORE_QUERIES))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        baseline = baseline or elapsed
+        print(f"| {workers} | {elapsed * 1000:.2f} | {1 / elapsed:,.0f} | {baseline / elapsed:.2f}x |")
+
+
+def ingest_mismatches(path):
+    """Records where iter_csv_records disagrees with csv.reader, or with its own byte offsets"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        expected = [fields for fields in csv.reader(f) if fields]
+    data = path.read_bytes()
+    problems = []
+    streamed = list(iter_csv_records(path))
+    if len(streamed) != len(expected):
+        problems.append(f"{len(streamed)} records, csv.reader reads {len(expected)}")
+    for n, ((start, length, fields), want) in enumerate(zip(streamed, expected)):
+        raw = data[start:start + length]
+        split = _split_record(raw)
+        if split is not None:
+            split = [field.decode('utf-8') for field in split]
+        if fields != want or _parse_record(raw) != want or split not in (None, want):
+            problems.append(f"record {n} differs: {fields!r} != {want!r}")
+    return problems
+
+
+def check_ingest(args):
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [(name, Path(tmp) / f"case{i}.csv") for i, name in enumerate(INGEST_CASES)]
+        for (name, path), data in zip(cases, INGEST_CASES.values()):
+            path.write_bytes(data)
+        cases += [(path.name, path) for path in sorted(DATA_DIR.rglob("*.csv"))]
+        for name, path in cases:
+            problems = ingest_mismatches(path)
+            failed += bool(problems)
+            print(f"{'FAIL' if problems else 'ok'}  {name}")
+            for problem in problems[:5]:
+                print(f"      {problem}")
+    if failed:
+        raise SystemExit(f"{failed} ingestion check(s) failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI/UX Mobile Bench")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Time streaming index builds by worker count")
+    build.add_argument("--rows", type=int, default=200000, help="Synthetic rows (default: 200000)")
+    build.add_argument("--workers", help="Comma-separated worker counts (default: 1,2,4,... up to core count)")
+    build.add_argument("--chunk-rows", type=int, default=5000, help="Rows per tokenization chunk (default: 5000)")
+    build.add_argument("--memory", action="store_true", help="Also compare peak heap against a whole-file in-process build")
+
+    score = sub.add_parser("score", help="Time sharded BM25 scoring by thread count")
+    score.add_argument("--rows", type=int, default=200000, help="Synthetic rows (default: 200000)")
+    score.add_argument("--workers", help="Comma-separated thread counts (default: 1,2,4,... up to core count)")
+    score.add_argument("--repeat", type=int, default=20, help="Passes over the query set per thread count (default: 20)")
+
+    sub.add_parser("check", help="Check streaming ingestion reads the same records as the csv module")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        bench_build(args)
+    elif args.command == "score":
+        bench_score(args)
+    elif args.command == "check":
+        check_ingest(args)
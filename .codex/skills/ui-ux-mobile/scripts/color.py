@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Mobile Color - perceptual colour index and WCAG contrast audit over the palettes in colors.csv
+Usage: python color.py nearest <hex> [<hex> ...] [--file <path|->] [-n <k>] [--palettes] [--json]
+       python color.py audit [--palette <name>] [--file <pairs.csv|pairs.jsonl|->] [--below <level>] [--json]
+
+Every swatch of the colour columns (`color_cols`) is converted to OKLab once and
+packed into an array('d'). Nearest-colour queries are a brute-force scan in that
+perceptually uniform space: vectorized with NumPy when it is installed, pure
+Python otherwise. Distances are reported as Delta E (OKLab distance x 100).
+The contrast audit checks palette role pairs (CONTRAST_PAIRS) or bulk
+foreground/background pairs against the WCAG 2.x thresholds the same way.
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import re
+import sys
+import threading
+from array import array
+from itertools import chain
+from pathlib import Path
+
+import core
+from core import CSV_CONFIG, MAX_RESULTS, read_source
+
+try:
+    import numpy as np
+except ImportError:  # optional: every operation has a pure-Python path
+    np = None
+
+
+# ============ CONFIGURATION ============
+QUERY_CHUNK = 4096  # queries per vectorized distance block, bounding the queries x swatches matrix
+
+# WCAG 2.x minimum contrast ratios; "Large" applies to large text and UI components
+WCAG_THRESHOLDS = {"AAA": 7.0, "AA": 4.5, "AAA Large": 4.5, "AA Large": 3.0}
+
+# (foreground role, background role) pairs every palette is audited on
+CONTRAST_PAIRS = [("On-Surface", "Surface"), ("Primary", "Surface"), ("Secondary", "Surface"), ("Tertiary", "Surface"), ("Error", "Surface")]
+
+# Accepted column / key names for bulk pairs, first match wins
+PAIR_KEYS = {
+    "foreground": ["foreground", "fg", "text", "color"],
+    "background": ["background", "bg", "surface"],
+    "name": ["name", "token", "pair"],
+}
+
+
+# ============ COLOR SPACE ============
+_HEX_RE = re.compile(r'^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+def parse_hex(value):
+    """Parse "#RRGGBB" or "#RGB" (the # is optional) into sRGB channels in 0..1"""
+    match = _HEX_RE.match(str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid hex colour: {value!r} (use #RRGGBB or #RGB)")
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = "".join(digit * 2 for digit in digits)
+    return tuple(int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def normalize_hex(value):
+    """Canonical "#RRGGBB" form of a hex colour"""
+    return "#" + "".join(f"{round(channel * 255):02X}" for channel in parse_hex(value))
+
+
+def srgb_to_linear(channel):
+    """Undo the sRGB transfer curve for one channel in 0..1"""
+    return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+
+def srgb_to_oklab(rgb):
+    """Convert sRGB channels in 0..1 to OKLab (L, a, b)"""
+    r, g, b = (srgb_to_linear(channel) for channel in rgb)
+    l = (0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b) ** (1 / 3)
+    m = (0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b) ** (1 / 3)
+    s = (0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b) ** (1 / 3)
+    return (
+        0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+        1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+        0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s,
+    )
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of sRGB channels in 0..1"""
+    r, g, b = (srgb_to_linear(channel) for channel in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def luminances(rgbs):
+    """Relative luminance of many sRGB triples, vectorized with NumPy when available"""
+    if np is not None and rgbs:
+        channels = np.asarray(rgbs, dtype=np.float64)
+        linear = np.where(channels <= 0.04045, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+        return (linear @ np.array([0.2126, 0.7152, 0.0722])).tolist()
+    return [relative_luminance(rgb) for rgb in rgbs]
+
+
+def hex_to_oklab(value):
+    """OKLab (L, a, b) of a hex colour"""
+    return srgb_to_oklab(parse_hex(value))
+
+
+# ============ COLOR INDEX ============
+class ColorIndex:
+    """Every hex swatch of the colour columns of the domains, packed in OKLab.
+
+    Swatch i is `swatches[i]` = (domain, palette, platform, role, hex), with its
+    L, a, b at `lab[3 * i:3 * i + 3]` and its WCAG relative luminance at `luminance[i]`.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = Path(data_dir) if data_dir is not None else core.DATA_DIR
+        self.swatches = []
+        self.lab = array('d')
+        self.luminance = array('d')
+        for domain, config in CSV_CONFIG.items():
+            filepath = self.data_dir / config["file"]
+            if not config.get("color_cols") or not filepath.exists():
+                continue
+            header, name_pos, records = read_source(filepath, config)
+            platform_pos = header.index("Platform") if "Platform" in header else None
+            color_positions = [(header.index(col), col) for col in config["color_cols"] if col in header]
+            for _, _, fields in records:
+                name = fields[name_pos] if name_pos < len(fields) else ""
+                platform = fields[platform_pos] if platform_pos is not None and platform_pos < len(fields) else ""
+                for pos, col in color_positions:
+                    if pos >= len(fields):
+                        continue
+                    try:
+                        rgb = parse_hex(fields[pos])
+                    except ValueError:
+                        continue
+                    self.swatches.append((domain, name, platform, col, normalize_hex(fields[pos])))
+                    self.lab.extend(srgb_to_oklab(rgb))
+                    self.luminance.append(relative_luminance(rgb))
+        # Zero-copy view of the packed array for vectorized queries
+        self._matrix = np.frombuffer(self.lab, dtype=np.float64).reshape(-1, 3) if np is not None and self.swatches else None
+
+    def __len__(self):
+        return len(self.swatches)
+
+    def _by_palette(self, order, k):
+        """First swatch of each palette along `order`, for the first k palettes"""
+        chosen = []
+        seen = set()
+        for i in order:
+            palette = self.swatches[i][:2]
+            if palette not in seen:
+                seen.add(palette)
+                chosen.append(i)
+                if len(chosen) == k:
+                    break
+        return chosen
+
+    def _scan(self, labs, k, palettes):
+        """Yield (squared distance to every swatch, ranked swatch ids) per query.
+
+        With NumPy, distances come from ||q||^2 + ||s||^2 - 2 q.s over blocks of
+        QUERY_CHUNK queries and ranking from one stable argsort per block.
+        """
+        if self._matrix is not None:
+            norms = (self._matrix ** 2).sum(axis=1)
+            for start in range(0, len(labs), QUERY_CHUNK):
+                block = np.asarray(labs[start:start + QUERY_CHUNK], dtype=np.float64).reshape(-1, 3)
+                squared = np.maximum((block ** 2).sum(axis=1)[:, None] + norms[None, :] - 2 * block @ self._matrix.T, 0)
+                order = np.argsort(squared, axis=1, kind="stable")
+                if not palettes:
+                    order = order[:, :k]
+                for distances, ids in zip(squared.tolist(), order.tolist()):
+                    yield distances, self._by_palette(ids, k) if palettes else ids
+            return
+
+        columns = list(zip(self.lab[0::3], self.lab[1::3], self.lab[2::3]))
+        for L, a, b in labs:
+            distances = [(L - x) ** 2 + (a - y) ** 2 + (b - z) ** 2 for x, y, z in columns]
+            if palettes:
+                ids = self._by_palette(sorted(range(len(distances)), key=distances.__getitem__), k)
+            else:
+                ids = heapq.nsmallest(k, range(len(distances)), key=distances.__getitem__)
+            yield distances, ids
+
+    def nearest_many(self, colors, k=MAX_RESULTS, palettes=False):
+        """Nearest swatches for each hex colour, in input order.
+
+        Returns one entry per colour: a list of result rows, or {"error": ...}
+        for a colour that does not parse. With palettes, each palette appears
+        at most once, represented by its closest role.
+        """
+        parsed = []
+        for color in colors:
+            try:
+                parsed.append((normalize_hex(color), hex_to_oklab(color)))
+            except ValueError as exc:
+                parsed.append((None, str(exc)))
+
+        scans = self._scan([lab for query, lab in parsed if query is not None], k, palettes)
+        answers = []
+        for query, lab in parsed:
+            if query is None:
+                answers.append({"error": lab})
+                continue
+            row, ids = next(scans)
+            results = []
+            for i in ids:
+                domain, palette, platform, role, value = self.swatches[i]
+                results.append({
+                    "Palette": palette,
+                    "Platform": platform,
+                    "Role": role,
+                    "Hex": value,
+                    "Delta E": round(row[i] ** 0.5 * 100, 2),
+                    "_domain": domain,
+                })
+            answers.append(results)
+        return answers
+
+    def nearest(self, color, k=MAX_RESULTS, palettes=False):
+        """Search-style result for the swatches (or palettes) closest to one hex colour"""
+        answer = self.nearest_many([color], k, palettes)[0]
+        if isinstance(answer, dict):
+            return answer
+        return {
+            "domain": "nearest-color",
+            "query": normalize_hex(color),
+            "palettes": palettes,
+            "count": len(answer),
+            "results": answer,
+        }
+
+    def audit(self, palette=None):
+        """Contrast of every CONTRAST_PAIRS role pair of every palette (or those whose name contains `palette`)"""
+        roles = {}
+        for i, (domain, name, _, role, _) in enumerate(self.swatches):
+            roles.setdefault((domain, name), {})[role] = i
+        pairs = []
+        for (domain, name), ids in roles.items():
+            if palette and palette.lower() not in name.lower():
+                continue
+            for fg_role, bg_role in CONTRAST_PAIRS:
+                if fg_role in ids and bg_role in ids:
+                    pairs.append((ids[fg_role], ids[bg_role], f"{fg_role} on {bg_role}"))
+
+        ratios = contrast_ratios([self.luminance[fg] for fg, _, _ in pairs], [self.luminance[bg] for _, bg, _ in pairs])
+        results = []
+        for (fg, bg, pair), ratio in zip(pairs, ratios):
+            domain, name, platform = self.swatches[fg][:3]
+            results.append({
+                "Palette": name,
+                "Platform": platform,
+                "Pair": pair,
+                **contrast_row(self.swatches[fg][4], self.swatches[bg][4], ratio),
+                "_domain": domain,
+            })
+        return results
+
+
+# ============ CONTRAST AUDIT ============
+def contrast_ratios(fg_luminances, bg_luminances):
+    """WCAG contrast ratios (lighter + 0.05) / (darker + 0.05) of parallel luminance lists"""
+    if np is not None and fg_luminances:
+        fg = np.asarray(fg_luminances, dtype=np.float64)
+        bg = np.asarray(bg_luminances, dtype=np.float64)
+        return ((np.maximum(fg, bg) + 0.05) / (np.minimum(fg, bg) + 0.05)).tolist()
+    return [(max(fg, bg) + 0.05) / (min(fg, bg) + 0.05) for fg, bg in zip(fg_luminances, bg_luminances)]
+
+
+def wcag_level(ratio):
+    """Highest WCAG level a contrast ratio meets (AAA, AA, AA Large) or Fail"""
+    for level in ("AAA", "AA", "AA Large"):
+        if ratio >= WCAG_THRESHOLDS[level]:
+            return level
+    return "Fail"
+
+
+def contrast_row(foreground, background, ratio):
+    """Result fields for one colour pair: ratio, pass/fail per threshold and overall level.
+
+    Thresholds are compared on the exact ratio; only the reported value is rounded.
+    """
+    row = {"Foreground": foreground, "Background": background, "Ratio": round(ratio, 2)}
+    for level, minimum in WCAG_THRESHOLDS.items():
+        row[level] = ratio >= minimum
+    row["Level"] = wcag_level(ratio)
+    return row
+
+
+def audit_pairs(pairs):
+    """Contrast rows for (foreground, background, name) colour pairs, in input order.
+
+    Each distinct colour is parsed and its luminance computed once, which keeps
+    token exports (few colours, many pairs) cheap; pairs that do not parse get
+    an "error" field instead of a ratio. A pair may carry an error of its own as
+    a fourth item (see read_pairs), which is reported as is.
+    """
+    pairs = [tuple(pair) + (None,) * (4 - len(pair)) for pair in pairs]
+    rgbs = {}
+    for foreground, background, _, error in pairs:
+        if error:
+            continue
+        for value in (foreground, background):
+            if value not in rgbs:
+                try:
+                    rgbs[value] = parse_hex(value)
+                except ValueError:
+                    rgbs[value] = None
+    valid = [value for value, rgb in rgbs.items() if rgb is not None]
+    table = dict(zip(valid, luminances([rgbs[value] for value in valid])))
+    canonical = {value: "#" + "".join(f"{round(channel * 255):02X}" for channel in rgbs[value]) for value in valid}
+
+    ok = [i for i, (fg, bg, _, error) in enumerate(pairs) if not error and fg in table and bg in table]
+    ratios = dict(zip(ok, contrast_ratios([table[pairs[i][0]] for i in ok], [table[pairs[i][1]] for i in ok])))
+    results = []
+    for i, (foreground, background, name, error) in enumerate(pairs):
+        row = {"Name": name} if name else {}
+        if i in ratios:
+            row.update(contrast_row(canonical[foreground], canonical[background], ratios[i]))
+        elif error:
+            row["error"] = error
+        else:
+            bad = foreground if foreground not in table else background
+            row.update({"Foreground": foreground, "Background": background, "error": f"Invalid hex colour: {bad!r}"})
+        results.append(row)
+    return results
+
+
+def _pair_keys(keys):
+    """Map foreground, background and name to the first of `keys` matching their PAIR_KEYS names"""
+    lowered = {str(key).strip().lower(): key for key in keys}
+    return [next((lowered[name] for name in PAIR_KEYS[field] if name in lowered), None) for field in PAIR_KEYS]
+
+
+def _pair(record, keys):
+    """(foreground, background, name) of one bulk record, given its resolved _pair_keys"""
+    return tuple(str(record.get(key) or "").strip() if key is not None else "" for key in keys)
+
+
+def read_pairs(path):
+    """Yield (foreground, background, name) from a CSV or JSONL file (or "-" for stdin).
+
+    JSONL records and CSV headers use the names in PAIR_KEYS; a CSV whose first
+    row is already two colours is read positionally as foreground, background[, name].
+    A JSONL line that does not parse to an object yields ("", "", "", error),
+    naming its line number, so the audit reports it and reads on.
+    """
+    stream = sys.stdin if str(path) == "-" else open(path, 'r', encoding='utf-8', newline='')
+    try:
+        lines = ((number, line) for number, line in enumerate(stream, 1) if line.strip())
+        first = next(lines, None)
+        if first is None:
+            return
+        if first[1].lstrip().startswith("{"):
+            for number, line in chain([first], lines):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield "", "", "", f"Line {number}: invalid JSON ({e.msg})"
+                    continue
+                if not isinstance(record, dict):
+                    yield "", "", "", f"Line {number}: expected a JSON object"
+                    continue
+                yield _pair(record, _pair_keys(record))
+            return
+        rows = csv.reader(chain([first[1]], (line for _, line in lines)))
+        header = next(rows)
+        if len(header) >= 2 and all(_HEX_RE.match(value.strip()) for value in header[:2]):
+            rows = chain([header], rows)
+            header = None
+        keys = _pair_keys(header) if header is not None else None
+        for row in rows:
+            if keys is not None:
+                yield _pair(dict(zip(header, row)), keys)
+            elif len(row) >= 2:
+                yield row[0].strip(), row[1].strip(), row[2].strip() if len(row) > 2 else ""
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_color_index():
+    """Return the shared ColorIndex for core.DATA_DIR, rebuilding it if DATA_DIR changed"""
+    global _default_index
+    index = _default_index
+    if index is None or index.data_dir != core.DATA_DIR:
+        with _default_index_lock:
+            if _default_index is None or _default_index.data_dir != core.DATA_DIR:
+                _default_index = ColorIndex()
+            index = _default_index
+    return index
+
+
+def nearest_color(color, max_results=MAX_RESULTS, palettes=False):
+    """Palette roles (or palettes) perceptually closest to a hex colour"""
+    return get_color_index().nearest(color, max_results, palettes)
+
+
+def read_colors(path):
+    """Read colours from a file (or "-" for stdin): one per line, first CSV field, blank lines skipped"""
+    stream = sys.stdin if str(path) == "-" else open(path, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            value = line.split(",", 1)[0].strip()
+            if value:
+                yield value
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def format_nearest(query, results):
+    """Markdown block listing the nearest swatches to one colour"""
+    output = [f"## Nearest colours to {query}\n"]
+    for i, row in enumerate(results, 1):
+        details = [row.get("Role", ""), f"`{row['Hex']}`" if row.get("Hex") else "", f"({row['Platform']})" if row.get("Platform") else ""]
+        distance = f" - Delta E {row['Delta E']}" if "Delta E" in row else ""
+        output.append(f"{i}. **{row.get('Palette', '')}** {' '.join(d for d in details if d)}{distance}".rstrip())
+    return "\n".join(output)
+
+
+def format_contrast(title, results):
+    """Markdown table of contrast rows with a pass/fail summary"""
+    levels = [row.get("Level") for row in results if "Level" in row]
+    output = [f"## Contrast Audit: {title}"]
+    output.append(f"**Pairs:** {len(results)} | **AA:** {sum(level in ('AA', 'AAA') for level in levels)} pass | "
+                  f"**AA Large only:** {levels.count('AA Large')} | **Fail:** {levels.count('Fail')}\n")
+    if not results:
+        return "\n".join(output)
+    label = "Palette" if any("Palette" in row for row in results) else "Name"
+    pair = any("Pair" in row for row in results)
+    output.append(f"| {label} |{' Pair |' if pair else ''} Foreground | Background | Ratio | Level |")
+    output.append(f"|---|{'---|' if pair else ''}---|---|---|---|")
+    for row in results:
+        level = row.get("Level") or f"Error: {row.get('error', '')}"
+        ratio = f"{row['Ratio']}:1" if "Ratio" in row else "-"
+        output.append(f"| {row.get(label, '')} |{' ' + row.get('Pair', '') + ' |' if pair else ''} "
+                      f"`{row.get('Foreground', '')}` | `{row.get('Background', '')}` | {ratio} | {level} |")
+    return "\n".join(output)
+
+
+def contrast_audit(palette=None):
+    """Search-style result auditing the role pairs of all palettes, or those matching `palette`"""
+    results = get_color_index().audit(palette)
+    return {"domain": "contrast", "query": palette or "all palettes", "count": len(results), "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI/UX Mobile Color")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    nearest = sub.add_parser("nearest", help="Closest palette roles to hex colours (OKLab distance)")
+    nearest.add_argument("colors", nargs="*", help="Hex colours, e.g. #6A4FA0")
+    nearest.add_argument("--file", help="Read colours from a file, one per line (first CSV field); - for stdin")
+    nearest.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Matches per colour (default: 3)")
+    nearest.add_argument("--palettes", action="store_true", help="Return each palette once, by its closest role")
+    nearest.add_argument("--json", action="store_true", help="Output JSON Lines, one object per colour")
+
+    audit = sub.add_parser("audit", help="WCAG contrast of palette role pairs, or of bulk colour pairs from a file")
+    audit.add_argument("--palette", help="Only palettes whose name contains this text")
+    audit.add_argument("--file", help="CSV or JSONL of foreground/background pairs (optional name); - for stdin")
+    audit.add_argument("--below", choices=list(WCAG_THRESHOLDS), help="Only report pairs failing this level")
+    audit.add_argument("--json", action="store_true", help="Output JSON Lines, one object per pair")
+
+    args = parser.parse_args()
+    if args.command == "audit":
+        if args.file:
+            results = audit_pairs(read_pairs(args.file))
+            title = "-" if args.file == "-" else Path(args.file).name
+        else:
+            results = get_color_index().audit(args.palette)
+            title = args.palette or "all palettes"
+        if args.below:
+            results = [row for row in results if not row.get(args.below, True)]
+        if args.json:
+            for row in results:
+                print(json.dumps(row, ensure_ascii=False))
+        else:
+            print(format_contrast(title, results))
+        sys.exit(1 if any("error" in row for row in results) else 0)
+    elif args.command == "nearest":
+        colors = list(args.colors)
+        if args.file:
+            colors.extend(read_colors(args.file))
+        if not colors:
+            parser.error("nearest needs at least one colour or --file")
+        if args.max_results < 1:
+            parser.error(f"--max-results must be >= 1 (got {args.max_results})")
+
+        answers = get_color_index().nearest_many(colors, args.max_results, args.palettes)
+        failed = 0
+        for color, answer in zip(colors, answers):
+            if isinstance(answer, dict):
+                failed += 1
+                if not args.json:
+                    print(f"Error: {answer['error']}", file=sys.stderr)
+                    continue
+                print(json.dumps({"query": color, **answer}, ensure_ascii=False))
+            elif args.json:
+                print(json.dumps({"query": normalize_hex(color), "results": answer}, ensure_ascii=False))
+            else:
+                print(format_nearest(normalize_hex(color), answer) + "\n")
+        sys.exit(1 if failed == len(colors) else 0)
@@ -6,15 +6,40 @@ Supports Material Design 3, iOS 26 Liquid Glass, KMP, and cross-platform pattern
 """
 
 import csv
+import hashlib
+import heapq
+import io
+import json
+import os
+import pickle
 import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from types import MappingProxyType
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Prebuilt index bundle written by compile_index.py into DATA_DIR / INDEX_DIR_NAME;
+# the CLI installer reads the BUNDLE_FORMAT line to check shipped bundles
+INDEX_DIR_NAME = "index"
+BUNDLE_FORMAT = 8
+
+# Search backends: in-memory BM25 (default) or SQLite FTS5 (sqlite_index.py), chosen
+# per engine or with the UIUX_MOBILE_BACKEND environment variable
+BACKENDS = ("memory", "sqlite")
+BACKEND_ENV = "UIUX_MOBILE_BACKEND"
+SQLITE_DB_NAME = "search.sqlite"  # FTS5 database, also under DATA_DIR / INDEX_DIR_NAME
+
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -24,78 +49,96 @@ CSV_CONFIG = {
     "color": {
         "file": "colors.csv",
         "search_cols": ["Palette Name", "Platform", "Dynamic Color Support"],
-        "output_cols": ["Palette Name", "Platform", "Primary", "Secondary", "Tertiary", "Surface", "On-Surface", "Error", "Dynamic Color Support"]
+        "output_cols": ["Palette Name", "Platform", "Primary", "Secondary", "Tertiary", "Surface", "On-Surface", "Error", "Dynamic Color Support"],
+        "color_cols": ["Primary", "Secondary", "Tertiary", "Surface", "On-Surface", "Error"]
     },
     "typography": {
         "file": "typography.csv",
         "search_cols": ["Style Name", "Platform", "Use Case"],
-        "output_cols": ["Style Name", "Platform", "Font Family", "Size", "Weight", "Line Height", "Letter Spacing", "Use Case"]
+        "output_cols": ["Style Name", "Platform", "Font Family", "Size", "Weight", "Line Height", "Letter Spacing", "Use Case"],
+        "numeric_cols": ["Size", "Line Height", "Letter Spacing"]
     },
     "component": {
         "file": "components.csv",
         "search_cols": ["Component", "Platform", "Accessibility", "Best Practices"],
-        "output_cols": ["Component", "Platform", "SwiftUI API", "Compose API", "Flutter API", "RN Component", "Accessibility", "Best Practices"]
+        "output_cols": ["Component", "Platform", "SwiftUI API", "Compose API", "Flutter API", "RN Component", "Accessibility", "Best Practices"],
+        "code_cols": ["SwiftUI API", "Compose API", "Flutter API", "RN Component"]
     },
     "navigation": {
         "file": "navigation.csv",
         "search_cols": ["Pattern", "Platform", "Best For", "Thumb Zone"],
-        "output_cols": ["Pattern", "Platform", "Implementation", "Thumb Zone", "Gesture Support", "Deep Linking", "Best For"]
+        "output_cols": ["Pattern", "Platform", "Implementation", "Thumb Zone", "Gesture Support", "Deep Linking", "Best For"],
+        "code_cols": ["Implementation"]
     },
     "gesture": {
         "file": "gestures.csv",
         "search_cols": ["Gesture", "Platform", "Haptic Feedback", "Accessibility Alternative"],
-        "output_cols": ["Gesture", "Platform", "SwiftUI", "Compose", "Flutter", "Haptic Feedback", "Accessibility Alternative"]
+        "output_cols": ["Gesture", "Platform", "SwiftUI", "Compose", "Flutter", "Haptic Feedback", "Accessibility Alternative"],
+        "code_cols": ["SwiftUI", "Compose", "Flutter"]
     },
     "accessibility": {
         "file": "accessibility.csv",
         "search_cols": ["Guideline", "WCAG Level", "Testing Method", "Priority"],
-        "output_cols": ["Guideline", "WCAG Level", "iOS Implementation", "Android Implementation", "Testing Method", "Priority"]
+        "output_cols": ["Guideline", "WCAG Level", "iOS Implementation", "Android Implementation", "Testing Method", "Priority"],
+        "code_cols": ["iOS Implementation", "Android Implementation"]
     },
     "animation": {
         "file": "animations.csv",
         "search_cols": ["Animation Type", "Platform", "Use Case", "Reduce Motion Alternative"],
-        "output_cols": ["Animation Type", "Platform", "Duration", "Easing", "SwiftUI API", "Compose API", "Use Case", "Reduce Motion Alternative"]
+        "output_cols": ["Animation Type", "Platform", "Duration", "Easing", "SwiftUI API", "Compose API", "Use Case", "Reduce Motion Alternative"],
+        "code_cols": ["SwiftUI API", "Compose API"],
+        "numeric_cols": ["Duration"]
     },
     # New domains
     "onboarding": {
         "file": "onboarding.csv",
         "search_cols": ["Pattern", "Type", "Platform", "Best For"],
-        "output_cols": ["Pattern", "Type", "Platform", "SwiftUI Implementation", "Compose Implementation", "Best For", "User Friction", "Conversion Impact", "Accessibility"]
+        "output_cols": ["Pattern", "Type", "Platform", "SwiftUI Implementation", "Compose Implementation", "Best For", "User Friction", "Conversion Impact", "Accessibility"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"]
     },
     "forms": {
         "file": "forms.csv",
         "search_cols": ["Pattern", "Category", "Platform", "Validation Timing"],
-        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Validation Timing", "Error Display", "Accessibility Notes"]
+        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Validation Timing", "Error Display", "Accessibility Notes"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"]
     },
     "responsive": {
         "file": "responsive.csv",
         "search_cols": ["Pattern", "Category", "Platform", "Width Range"],
-        "output_cols": ["Pattern", "Category", "Platform", "Width Range", "SwiftUI Implementation", "Compose Implementation", "Navigation Change", "Grid Columns", "Use Case"]
+        "output_cols": ["Pattern", "Category", "Platform", "Width Range", "SwiftUI Implementation", "Compose Implementation", "Navigation Change", "Grid Columns", "Use Case"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"]
     },
     "errors": {
         "file": "errors.csv",
         "search_cols": ["Pattern", "Category", "Platform", "User Message Style"],
-        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "User Message Style", "Recovery Action", "Accessibility"]
+        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "User Message Style", "Recovery Action", "Accessibility"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"]
     },
     "tokens": {
         "file": "tokens.csv",
         "search_cols": ["Token Name", "Level", "Category", "Platform"],
-        "output_cols": ["Token Name", "Level", "Category", "Platform", "SwiftUI Usage", "Compose Usage", "Example Value", "Theme Support", "Description"]
+        "output_cols": ["Token Name", "Level", "Category", "Platform", "SwiftUI Usage", "Compose Usage", "Example Value", "Theme Support", "Description"],
+        "code_cols": ["SwiftUI Usage", "Compose Usage"]
     },
     "spacing": {
         "file": "spacing.csv",
         "search_cols": ["Pattern", "Category", "Platform", "Use Case"],
-        "output_cols": ["Pattern", "Category", "Platform", "Value iOS", "Value Android", "SwiftUI Usage", "Compose Usage", "Use Case", "Density Mode"]
+        "output_cols": ["Pattern", "Category", "Platform", "Value iOS", "Value Android", "SwiftUI Usage", "Compose Usage", "Use Case", "Density Mode"],
+        "code_cols": ["SwiftUI Usage", "Compose Usage"],
+        "numeric_cols": ["Value iOS", "Value Android"]
     },
     "loading": {
         "file": "loading.csv",
         "search_cols": ["Pattern", "Category", "Platform", "Use Case"],
-        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Duration", "Use Case", "Accessibility Alternative"]
+        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Duration", "Use Case", "Accessibility Alternative"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"],
+        "numeric_cols": ["Duration"]
     },
     "performance": {
         "file": "performance.csv",
         "search_cols": ["Pattern", "Category", "Platform", "Impact"],
-        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Impact", "Measurement", "Best Practice"]
+        "output_cols": ["Pattern", "Category", "Platform", "SwiftUI Implementation", "Compose Implementation", "Impact", "Measurement", "Best Practice"],
+        "code_cols": ["SwiftUI Implementation", "Compose Implementation"]
     }
 }
 
@@ -112,105 +155,1887 @@ STACK_CONFIG = {
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
+    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"],
+    "code_cols": ["Code Good"],  # Code Bad holds anti-patterns, never offered as snippets
+    "name_col": "Guideline"
 }
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+def iter_sources():
+    """Yield (kind, name, config) for every domain and stack (kind: domain or stack)"""
+    for domain, config in CSV_CONFIG.items():
+        yield "domain", domain, config
+    for stack, config in STACK_CONFIG.items():
+        yield "stack", stack, {**_STACK_COLS, **config}
+
+
 # ============ BM25 IMPLEMENTATION ============
+SHARD_MIN_DOCS = 20000  # smaller indexes are always scored serially
+
+# True on free-threaded builds (3.13t+) running without the GIL; only then do
+# scoring threads run in parallel, so engines shard scoring by default
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _is_word_char(text, pos):
+    """Whether text[pos] exists and is a letter, digit or underscore"""
+    return 0 <= pos < len(text) and (text[pos].isalnum() or text[pos] == '_')
+
+
+def _query_spans(row, query_terms):
+    """Character spans of query terms per column of a decoded row: {column: [[start, end], ...]}.
+
+    A span is a whole token equal to a query term ignoring case, i.e. exactly
+    the tokens BM25 matched. Terms are found with str.find in the lowercased
+    value; the rare value whose length changes when lowercased is matched by regex.
+    """
+    if not query_terms:
+        return {}
+    spans = {}
+    for col, value in row.items():
+        if not value:
+            continue
+        value = str(value)
+        text = value.lower()
+        if len(text) != len(value):
+            alternatives = "|".join(re.escape(term) for term in sorted(query_terms, key=len, reverse=True))
+            found = [[match.start(), match.end()] for match in
+                     re.finditer(r'(?<!\w)(?:' + alternatives + r')(?!\w)', value, re.IGNORECASE)]
+        else:
+            found = []
+            for term in query_terms:
+                start = text.find(term)
+                while start >= 0:
+                    end = start + len(term)
+                    if not _is_word_char(text, start - 1) and not _is_word_char(text, end):
+                        found.append([start, end])
+                    start = text.find(term, end)
+            found.sort()
+        if found:
+            spans[col] = found
+    return spans
+
+
+def _tokenize_chunk(chunk, tokenize=None):
+    """Tokenize a chunk of documents into partial postings (process-pool worker).
+
+    `chunk` is (first_doc_id, documents). Returns (first_doc_id, doc_lengths,
+    postings) where postings maps term -> (doc ids, term freqs) as arrays.
+    """
+    first_doc, documents = chunk
+    tokenize = tokenize or BM25.tokenize
+    doc_lengths = array('I')
+    postings = {}
+    for doc_id, doc in enumerate(documents, first_doc):
+        tokens = tokenize(doc)
+        doc_lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = (array('I'), array('I'))
+            entry[0].append(doc_id)
+            entry[1].append(tf)
+    return first_doc, doc_lengths, postings
+
+
+def _rank_key(hit):
+    """Order (doc id, score) hits best first; ties keep doc order"""
+    return hit[1], -hit[0]
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search.
+
+    Built with fit() or add_chunk() + finalize(). finalize() freezes the model:
+    idf, doc_freqs and postings become read-only mappings (postings of read-only
+    views) and attributes can no longer be set, so one fitted model can be
+    scored from any number of threads.
+    """
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.postings = {}
+        self.doc_lengths = array('I')
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
         self.N = 0
 
-    def tokenize(self, text):
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is immutable once finalized")
+        object.__setattr__(self, name, value)
+
+    @staticmethod
+    def tokenize(text):
         """Lowercase, split, remove punctuation, filter short words"""
         text = re.sub(r'[^\w\s]', ' ', str(text).lower())
         return [w for w in text.split() if len(w) > 2]
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
+        self.add_chunk(*_tokenize_chunk((0, list(documents)), self.tokenize)[1:])
+        self.finalize()
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+    def add_chunk(self, doc_lengths, postings):
+        """Append the partial postings of the next chunk of documents, in doc id order"""
+        if getattr(self, "_frozen", False):
+            raise RuntimeError(f"{type(self).__name__} is already finalized; build a new one")
+        self.doc_lengths.extend(doc_lengths)
+        for term, (doc_ids, tfs) in postings.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                self.postings[term] = (doc_ids, tfs)
+            else:
+                entry[0].extend(doc_ids)
+                entry[1].extend(tfs)
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+    def finalize(self):
+        """Compute corpus statistics and IDF once all chunks have been added, then freeze"""
+        self.N = len(self.doc_lengths)
+        if self.N:
+            self.avgdl = sum(self.doc_lengths) / self.N
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
-
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
-
-            scores.append((idx, score))
+            for word, (doc_ids, _) in self.postings.items():
+                self.doc_freqs[word] = len(doc_ids)
+
+            for word, freq in self.doc_freqs.items():
+                self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
+        # A defaultdict would insert on lookup of an unknown term
+        self.doc_freqs = MappingProxyType(dict(self.doc_freqs))
+        self.idf = MappingProxyType(self.idf)
+        self.doc_lengths = memoryview(self.doc_lengths).toreadonly()
+        self.postings = MappingProxyType({
+            term: (memoryview(doc_ids).toreadonly(), memoryview(tfs).toreadonly())
+            for term, (doc_ids, tfs) in self.postings.items()
+        })
+        self._frozen = True
+
+    def _accumulate(self, terms, start=0, stop=None):
+        """Sum BM25 contributions per document over the postings of the query terms,
+        for doc ids in [start, stop) (default: all)"""
+        scores = {}
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        doc_lengths = self.doc_lengths
+        bounded = start > 0 or (stop is not None and stop < self.N)
+        for token in terms:
+            if token not in self.idf:
+                continue
+            idf = self.idf[token]
+            doc_ids, tfs = self.postings[token]
+            if bounded:
+                lo = bisect_left(doc_ids, start)
+                hi = bisect_left(doc_ids, stop, lo)
+                doc_ids, tfs = doc_ids[lo:hi], tfs[lo:hi]
+            for doc_id, tf in zip(doc_ids, tfs):
+                numerator = tf * (k1 + 1)
+                denominator = tf + k1 * (1 - b + b * doc_lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0) + idf * numerator / denominator
+        return scores
+
+    def score(self, query):
+        """Score all documents against query (read-only, safe to call from many threads)"""
+        matched = self._accumulate(self.tokenize(query))
+        scores = [(idx, matched.get(idx, 0)) for idx in range(self.N)]
         return sorted(scores, key=lambda x: x[1], reverse=True)
 
+    def to_dict(self):
+        """Serialize the fitted model (IDF and corpus stats are recomputed on load)"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": list(self.doc_lengths),
+            "postings": {term: [list(doc_ids), list(tfs)] for term, (doc_ids, tfs) in self.postings.items()},
+        }
 
-# ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a model serialized with to_dict()"""
+        bm25 = cls(data["k1"], data["b"])
+        bm25.add_chunk(
+            array('I', data["doc_lengths"]),
+            {term: (array('I', doc_ids), array('I', tfs)) for term, (doc_ids, tfs) in data["postings"].items()},
+        )
+        bm25.finalize()
+        return bm25
 
+    def _top_range(self, terms, k, docs, start, stop):
+        """The k best hits among doc ids in [start, stop)"""
+        matched = self._accumulate(terms, start, stop)
+        if docs is not None:
+            matched = {doc_id: score for doc_id, score in matched.items() if doc_id in docs}
+        return heapq.nlargest(k, matched.items(), key=_rank_key)
+
+    def top(self, query, k, docs=None, pool=None, shards=1):
+        """Return the k best (doc id, score) pairs with score > 0, best first.
+
+        `docs` optionally restricts results to a container of doc ids (e.g. a range).
+        With a thread `pool` and shards > 1, indexes of SHARD_MIN_DOCS or more are
+        split into doc id ranges scored concurrently, and the per-shard top k
+        merged; the result is identical to serial scoring.
+        """
+        terms = self.tokenize(query)
+        if pool is None or shards < 2 or self.N < SHARD_MIN_DOCS:
+            return self._top_range(terms, k, docs, 0, self.N)
+        bounds = [self.N * shard // shards for shard in range(shards + 1)]
+        parts = pool.map(lambda shard: self._top_range(terms, k, docs, bounds[shard], bounds[shard + 1]), range(shards))
+        return heapq.nlargest(k, chain.from_iterable(parts), key=_rank_key)
+
+
+# ============ CODE INDEX ============
+_CODE_IDENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+_CAMEL_PART_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+
+def code_tokenize(text):
+    """Tokenize code: dotted paths, each identifier, and its camelCase parts.
+
+    `spring(stiffness: Spring.StiffnessLow)` yields spring, stiffness,
+    spring.stiffnesslow, stiffnesslow, stiffness and low, so both exact
+    identifiers and their words match. Punctuation and argument syntax only
+    separate tokens.
+    """
+    tokens = []
+    for path in _CODE_IDENT_RE.findall(str(text)):
+        idents = path.split('.')
+        if len(idents) > 1:
+            tokens.append(path.lower())
+        for ident in idents:
+            tokens.append(ident.lower())
+            parts = _CAMEL_PART_RE.findall(ident)
+            if len(parts) > 1:
+                tokens.extend(part.lower() for part in parts if len(part) > 1)
+    return [token for token in tokens if len(token) > 1]
+
+
+class CodeBM25(BM25):
+    """BM25 over code snippets, using the identifier-aware tokenizer"""
+
+    tokenize = staticmethod(code_tokenize)
+
+
+class _CodeIndex:
+    """One CodeBM25 index over every code column (`code_cols`) of all domains and stacks.
+
+    Each document is a single cell, stored with its source, row name and column
+    so hits can be returned as snippets without touching the CSVs again.
+    """
+
+    def __init__(self, data_dir):
+        started = time.perf_counter()
+        self.entries = []  # (kind, source, row name, column, code)
+        self.scopes = {}   # source name -> range of entry ids
+        for kind, name, config in iter_sources():
+            filepath = data_dir / config["file"]
+            if not config.get("code_cols") or not filepath.exists():
+                continue
+            header, name_pos, records = read_source(filepath, config)
+            code_positions = [(header.index(col), col) for col in config["code_cols"] if col in header]
+            first = len(self.entries)
+            for _, _, fields in records:
+                for pos, col in code_positions:
+                    if pos < len(fields) and fields[pos].strip():
+                        self.entries.append((kind, name, fields[name_pos] if name_pos < len(fields) else "", col, fields[pos]))
+            self.scopes[name] = range(first, len(self.entries))
+
+        self.bm25 = CodeBM25()
+        self.bm25.fit(entry[4] for entry in self.entries)
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return len(self.entries)
+
+    def to_dict(self):
+        """Serialize entries, scopes and model for the prebuilt index bundle"""
+        return {
+            "entries": [list(entry) for entry in self.entries],
+            "scopes": {name: [scope.start, scope.stop] for name, scope in self.scopes.items()},
+            "bm25": self.bm25.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a code index from its bundle entry"""
+        started = time.perf_counter()
+        index = cls.__new__(cls)
+        index.entries = [tuple(entry) for entry in data["entries"]]
+        index.scopes = {name: range(start, stop) for name, (start, stop) in data["scopes"].items()}
+        index.bm25 = CodeBM25.from_dict(data["bm25"])
+        index.build_seconds = time.perf_counter() - started
+        return index
+
+    def search(self, query, scope, max_results):
+        """Return the best matching code cells as snippets, optionally within one source.
+
+        A row repeating the same code in several columns (e.g. one widget name
+        under both Compose API and Flutter API) is returned once, from its best
+        column; hits are over-fetched until max_results distinct snippets are found.
+        """
+        docs = self.scopes.get(scope, range(0)) if scope else None
+        fetch = max(max_results, 1) * 2
+        while True:
+            hits = self.bm25.top(query, fetch, docs)
+            results = []
+            seen = set()
+            for idx, _ in hits:
+                if len(results) >= max_results:
+                    return results
+                kind, source, name, column, code = self.entries[idx]
+                if (source, name, code) not in seen:
+                    seen.add((source, name, code))
+                    results.append({"Name": name, "Column": column, "Code": code, "_" + kind: source})
+            if len(hits) < fetch:
+                return results
+            fetch *= 2
+
+
+# ============ API TRANSLATION INDEX ============
+# Columns holding each platform's API, in lookup order
+PLATFORM_API_COLS = {
+    "swiftui": ["SwiftUI API", "SwiftUI", "SwiftUI Implementation", "SwiftUI Usage", "iOS Implementation"],
+    "compose": ["Compose API", "Compose", "Compose Implementation", "Compose Usage", "Android Implementation"],
+    "flutter": ["Flutter API", "Flutter"],
+    "react-native": ["RN Component"],
+}
+
+PLATFORM_ALIASES = {
+    "ios": "swiftui",
+    "android": "compose",
+    "jetpack-compose": "compose",
+    "kmp-compose": "compose",
+    "rn": "react-native",
+}
+
+_API_SPACE_RE = re.compile(r'\s*([().,:;=<>{}\[\]+])\s*')
+
+
+def normalize_api(text):
+    """Canonical form of an API string: lowercase, single spaces, no space around
+    punctuation, no leading dots and no trailing empty call or semicolon"""
+    text = " ".join(str(text).lower().split())
+    text = _API_SPACE_RE.sub(r'\1', text).lstrip('.')
+    while text.endswith(('()', ';')):
+        text = text[:-2] if text.endswith('()') else text[:-1]
+    return text
+
+
+def _api_segments(value):
+    """Split a cell like "TapGesture onTapGesture" into its top-level API fragments"""
+    segments, depth, current = [], 0, []
+    for char in value:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth = max(0, depth - 1)
+        if depth == 0 and (char.isspace() or char == '+'):
+            if current:
+                segments.append("".join(current))
+                current = []
+            continue
+        current.append(char)
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def _api_keys(value):
+    """Hash keys for a cell: the whole value plus each code-looking fragment"""
+    keys = [normalize_api(value)]
+    segments = _api_segments(value)
+    if len(segments) > 1:
+        for segment in segments:
+            if re.search(r'[A-Z._(]', segment) and len(segment) > 2:
+                keys.append(normalize_api(segment))
+    return [key for key in dict.fromkeys(keys) if key]
+
+
+def _api_head(key):
+    """Call head of a normalized API ("buttonstyle(.bordered)" -> "buttonstyle")"""
+    return key.split('(', 1)[0]
+
+
+class _ApiIndex:
+    """Hash index from every normalized platform API value to its row's sibling APIs.
+
+    Rows with at least two platform columns become translation groups; every
+    API value (and each code fragment of it) maps to the groups containing it,
+    so a lookup is a single dict access.
+    """
+
+    def __init__(self, data_dir):
+        started = time.perf_counter()
+        self.groups = []  # (kind, source, row name, {platform: [column, value]})
+        self.exact = {}   # normalized API -> [[group id, platform], ...]
+        self.heads = {}   # call head -> [[group id, platform], ...]
+        for kind, name, config in iter_sources():
+            filepath = data_dir / config["file"]
+            if not filepath.exists():
+                continue
+            header, name_pos, records = read_source(filepath, config)
+            platform_cols = {
+                platform: [(header.index(col), col) for col in cols if col in header]
+                for platform, cols in PLATFORM_API_COLS.items()
+            }
+            if sum(1 for cols in platform_cols.values() if cols) < 2:
+                continue
+            for _, _, fields in records:
+                apis = {}
+                for platform, cols in platform_cols.items():
+                    for pos, col in cols:
+                        if pos < len(fields) and fields[pos].strip():
+                            apis[platform] = [col, fields[pos].strip()]
+                            break
+                if len(apis) < 2:
+                    continue
+                group_id = len(self.groups)
+                self.groups.append((kind, name, fields[name_pos] if name_pos < len(fields) else "", apis))
+                for platform, (_, value) in apis.items():
+                    for key in _api_keys(value):
+                        self.exact.setdefault(key, []).append([group_id, platform])
+                        head = _api_head(key)
+                        if head != key:
+                            self.heads.setdefault(head, []).append([group_id, platform])
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return len(self.exact)
+
+    def to_dict(self):
+        """Serialize groups and hash tables for the prebuilt index bundle"""
+        return {"groups": [list(group) for group in self.groups], "exact": self.exact, "heads": self.heads}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore an API index from its bundle entry"""
+        started = time.perf_counter()
+        index = cls.__new__(cls)
+        index.groups = [tuple(group) for group in data["groups"]]
+        index.exact = data["exact"]
+        index.heads = data["heads"]
+        index.build_seconds = time.perf_counter() - started
+        return index
+
+    def translate(self, api, target, max_results):
+        """Sibling APIs on `target` for rows where `api` appears on another platform.
+
+        Exact matches come first; if there are none, rows sharing the call head
+        (e.g. `.buttonStyle(...)`) are returned as partial matches.
+        """
+        key = normalize_api(api)
+        hits, match = self.exact.get(key), "exact"
+        if not hits:
+            hits, match = self.heads.get(_api_head(key)), "partial"
+
+        results = []
+        seen = set()
+        for group_id, platform in hits or ():
+            kind, source, name, apis = self.groups[group_id]
+            if platform == target or target not in apis or group_id in seen:
+                continue
+            seen.add(group_id)
+            from_col, from_value = apis[platform]
+            to_col, to_value = apis[target]
+            results.append({"Name": name, from_col: from_value, to_col: to_value, "Match": match, "_" + kind: source})
+            if len(results) == max_results:
+                break
+        return results
+
+
+# ============ RELATED ITEMS GRAPH ============
+RELATED_K = 5            # neighbours kept per row
+RELATED_PER_SOURCE = 2   # at most this many neighbours from any one domain or stack
+RELATED_MIN_SCORE = 0.1  # cosine similarity below this is not worth suggesting
+RELATED_MAX_DF = 0.1     # terms in more than this share of rows are too common to link on
+
+
+class _RelatedGraph:
+    """k-nearest-neighbour graph linking rows across all domains and stacks.
+
+    Every row becomes a TF-IDF vector over its search columns (minus Platform);
+    each keeps its RELATED_K most cosine-similar rows from *other* sources.
+    Edges are stored in CSR form: `edges[starts[d]:starts[d + 1]]` are doc d's
+    neighbours, with similarities in thousandths in the parallel `weights`.
+    """
+
+    def __init__(self, data_dir):
+        started = time.perf_counter()
+        self.sources = []  # (kind, source name, CSV file, first doc id)
+        self.names = []    # row name per doc id
+        doc_sources = array('I')
+        documents = []
+        for kind, name, config in iter_sources():
+            filepath = data_dir / config["file"]
+            if not filepath.exists():
+                continue
+            header, name_pos, records = read_source(filepath, config)
+            col_positions = [header.index(col) for col in config["search_cols"] if col in header and col != "Platform"]
+            self.sources.append((kind, name, config["file"], len(self.names)))
+            for _, _, fields in records:
+                self.names.append(fields[name_pos] if name_pos < len(fields) else "")
+                doc_sources.append(len(self.sources) - 1)
+                documents.append(Counter(BM25.tokenize(" ".join(fields[i] for i in col_positions if i < len(fields)))))
+
+        # L2-normalized (1 + log tf) * idf vectors; only shared, not-too-common terms get postings
+        N = len(documents)
+        df = Counter(term for doc in documents for term in doc)
+        max_df = max(2, int(N * RELATED_MAX_DF))
+        vectors = []
+        postings = defaultdict(list)
+        for doc_id, doc in enumerate(documents):
+            weights = {term: (1 + log(tf)) * log(N / df[term]) for term, tf in doc.items()}
+            norm = sum(w * w for w in weights.values()) ** 0.5 or 1.0
+            vector = [(term, w / norm) for term, w in weights.items() if 1 < df[term] <= max_df]
+            vectors.append(vector)
+            for term, w in vector:
+                postings[term].append((doc_id, w))
+
+        self.starts = array('I', [0])
+        self.edges = array('I')
+        self.weights = array('H')
+        for doc_id, vector in enumerate(vectors):
+            own = doc_sources[doc_id]
+            scores = defaultdict(float)
+            for term, w in vector:
+                for other, other_w in postings[term]:
+                    if doc_sources[other] != own:
+                        scores[other] += w * other_w
+            per_source = Counter()
+            for other, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+                if score < RELATED_MIN_SCORE or len(self.edges) - self.starts[-1] == RELATED_K:
+                    break
+                if per_source[doc_sources[other]] < RELATED_PER_SOURCE:
+                    per_source[doc_sources[other]] += 1
+                    self.edges.append(other)
+                    self.weights.append(round(score * 1000))
+            self.starts.append(len(self.edges))
+        self._doc_sources = doc_sources
+        self.build_seconds = time.perf_counter() - started
+
+    def __len__(self):
+        return len(self.edges)
+
+    def to_dict(self):
+        """Serialize sources, row names and CSR edges for the prebuilt index bundle"""
+        return {
+            "sources": [list(source) for source in self.sources],
+            "names": self.names,
+            "starts": list(self.starts),
+            "edges": list(self.edges),
+            "weights": list(self.weights),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore the related graph from its bundle entry"""
+        started = time.perf_counter()
+        index = cls.__new__(cls)
+        index.sources = [tuple(source) for source in data["sources"]]
+        index.names = data["names"]
+        index.starts = array('I', data["starts"])
+        index.edges = array('I', data["edges"])
+        index.weights = array('H', data["weights"])
+        stops = [source[3] for source in index.sources[1:]] + [len(index.names)]
+        index._doc_sources = array('I')
+        for source_id, (source, stop) in enumerate(zip(index.sources, stops)):
+            index._doc_sources.extend([source_id] * (stop - source[3]))
+        index.build_seconds = time.perf_counter() - started
+        return index
+
+    def related(self, source_file, row):
+        """Neighbours of row `row` of a data-relative CSV file, most similar first"""
+        first = next((source[3] for source in self.sources if source[2] == source_file), None)
+        if first is None or first + row + 1 >= len(self.starts):
+            return []
+        doc_id = first + row
+        results = []
+        for i in range(self.starts[doc_id], self.starts[doc_id + 1]):
+            other = self.edges[i]
+            kind, name, _, _ = self.sources[self._doc_sources[other]]
+            results.append({"Name": self.names[other], "_" + kind: name, "Score": self.weights[i] / 1000})
+        return results
+
+
+# ============ NUMERIC RANGE INDEX ============
+# Units of numeric columns and --where filters: (dimension, factor to the dimension's base unit).
+# sp, dp and pt are all density-independent points and compare as equal.
+NUMERIC_UNITS = {"ms": ("time", 1), "s": ("time", 1000), "sp": ("length", 1), "dp": ("length", 1), "pt": ("length", 1)}
+NUMERIC_WORDS = {"instant": (0.0, 0.0, "time")}
+_UNIT_PATTERN = r'(?:(ms|sp|dp|pt|s)\b)?'
+_NUMERIC_RE = re.compile(r'([-+]?\d+(?:\.\d+)?)\s*' + _UNIT_PATTERN + r'(?:\s*-\s*(\d+(?:\.\d+)?)\s*' + _UNIT_PATTERN + r')?')
+_ANY_UNIT_RE = re.compile(r'\d\s*(ms|sp|dp|pt|s)\b')
+_WHERE_BETWEEN_RE = re.compile(r'^(.+?)\s+between\s+(.+?)\s+and\s+(.+?)$', re.IGNORECASE)
+_WHERE_COMPARE_RE = re.compile(r'^(.+?)\s*(<=|>=|==|=|<|>)\s*(.+?)$')
+_WHERE_VALUE_RE = re.compile(r'^([-+]?\d+(?:\.\d+)?)\s*(ms|sp|dp|pt|s)?$', re.IGNORECASE)
+
+
+def parse_numeric(text):
+    """Parse a free-text value ("57sp", "~300ms", "150-200ms", "1-2s loop") into (low, high, dimension).
+
+    Values are scaled to their dimension's base unit (ms for time). A range end
+    without a unit takes the other end's; a lone number takes the first unit in
+    the text ("44x44pt"), and a bare number ("0") gets dimension None, i.e. its
+    column's. Returns None when no usable number is found.
+    """
+    text = str(text).strip().lower()
+    words = text.split()
+    if words and words[0] in NUMERIC_WORDS:
+        return NUMERIC_WORDS[words[0]]
+    match = _NUMERIC_RE.search(text)
+    if not match:
+        return None
+    low, low_unit, high, high_unit = match.groups()
+    if not low_unit and not high_unit:
+        any_unit = _ANY_UNIT_RE.search(text)
+        if not any_unit:
+            bare = _WHERE_VALUE_RE.match(text)
+            return (float(bare.group(1)), float(bare.group(1)), None) if bare else None
+        low_unit = any_unit.group(1)
+    low_unit = low_unit or high_unit
+    high_unit = high_unit or low_unit
+    (dimension, low_scale), (high_dimension, high_scale) = NUMERIC_UNITS[low_unit], NUMERIC_UNITS[high_unit]
+    if dimension != high_dimension:
+        return None
+    low = float(low) * low_scale
+    high = float(high) * high_scale if high else low
+    return (min(low, high), max(low, high), dimension)
+
+
+def _field_key(name):
+    """Case- and punctuation-insensitive form of a column or --where field name"""
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+
+def numeric_fields(field, columns):
+    """Columns a --where field refers to: an exact name, or a prefix ("value" -> Value iOS, Value Android)"""
+    key = _field_key(field)
+    exact = [col for col in columns if _field_key(col) == key]
+    return exact or [col for col in columns if key and _field_key(col).startswith(key)]
+
+
+def _where_value(text, spec):
+    """Parse one bound of a --where condition into (value in base units, dimension or None)"""
+    match = _WHERE_VALUE_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid number in --where: {text!r} (in {spec!r})")
+    value, unit = match.groups()
+    if not unit:
+        return float(value), None
+    dimension, scale = NUMERIC_UNITS[unit.lower()]
+    return float(value) * scale, dimension
+
+
+def parse_where(spec):
+    """Parse --where conditions ("duration<=250ms, size between 14 and 22sp") joined by commas.
+
+    Each becomes (field, low, high, low_open, high_open, dimension); dimension is
+    None when no unit is given, which matches a column in its own base unit.
+    """
+    conditions = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        between = _WHERE_BETWEEN_RE.match(part)
+        if between:
+            field, low_text, high_text = between.groups()
+            (low, low_dim), (high, high_dim) = _where_value(low_text, part), _where_value(high_text, part)
+            if low_dim and high_dim and low_dim != high_dim:
+                raise ValueError(f"Mixed units in --where: {part!r}")
+            conditions.append((field.strip(), min(low, high), max(low, high), False, False, low_dim or high_dim))
+            continue
+        compare = _WHERE_COMPARE_RE.match(part)
+        if not compare:
+            raise ValueError(f"Invalid --where condition: {part!r} (use e.g. duration<=250ms or size between 14 and 22sp)")
+        field, op, value_text = compare.groups()
+        value, dimension = _where_value(value_text, part)
+        low, high = {"<": (float("-inf"), value), "<=": (float("-inf"), value), ">": (value, float("inf")), ">=": (value, float("inf"))}.get(op, (value, value))
+        conditions.append((field.strip(), low, high, op == ">", op == "<", dimension))
+    if not conditions:
+        raise ValueError("Empty --where filter")
+    return conditions
+
+
+class _NumericIndex:
+    """Numeric values parsed from free-text columns (see parse_numeric), kept sorted for range filters.
+
+    Each column stores its (low, high) intervals twice, ordered by low end and by
+    high end, so a filter is two binary searches: rows starting at or below the
+    upper bound, intersected with rows ending at or above the lower bound.
+    """
+
+    def __init__(self, columns=()):
+        self.columns = {}
+        self._pending = {col: [] for col in columns}  # column -> [(low, high, dimension, doc id)] until finalize
+
+    def add(self, doc_id, col, text):
+        """Parse one cell of a numeric column; cells without a usable number are skipped"""
+        parsed = parse_numeric(text)
+        if parsed is not None:
+            self._pending[col].append((*parsed, doc_id))
+
+    def finalize(self):
+        """Sort every column; values outside a column's most common dimension are dropped"""
+        for col, values in self._pending.items():
+            dimensions = Counter(value[2] for value in values if value[2] is not None)
+            dimension = dimensions.most_common(1)[0][0] if dimensions else None
+            values = [value for value in values if value[2] in (dimension, None)]
+            by_low = sorted(values, key=lambda value: (value[0], value[3]))
+            by_high = sorted(values, key=lambda value: (value[1], value[3]))
+            self.columns[col] = {
+                "dimension": dimension,
+                "lows": array('d', [value[0] for value in by_low]),
+                "low_docs": array('I', [value[3] for value in by_low]),
+                "highs": array('d', [value[1] for value in by_high]),
+                "high_docs": array('I', [value[3] for value in by_high]),
+            }
+        self._pending = {}
+
+    def to_dict(self):
+        """Serialize the sorted columns for the prebuilt index bundle"""
+        return {col: {key: value if key == "dimension" else list(value) for key, value in data.items()} for col, data in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Restore a numeric index serialized with to_dict()"""
+        index = cls()
+        index.columns = {
+            col: {
+                "dimension": values["dimension"],
+                "lows": array('d', values["lows"]),
+                "low_docs": array('I', values["low_docs"]),
+                "highs": array('d', values["highs"]),
+                "high_docs": array('I', values["high_docs"]),
+            }
+            for col, values in data.items()
+        }
+        return index
+
+    def filter(self, conditions):
+        """Set of doc ids satisfying every condition (see parse_where).
+
+        A row passes a condition when its interval overlaps the condition's
+        range in any column the field refers to.
+        """
+        allowed = None
+        for field, low, high, low_open, high_open, dimension in conditions:
+            cols = numeric_fields(field, self.columns)
+            if not cols:
+                available = ", ".join(self.columns) or "none"
+                raise ValueError(f"No numeric column matches '{field}' (numeric columns here: {available})")
+            usable = [col for col in cols if dimension in (None, self.columns[col]["dimension"])]
+            if not usable:
+                raise ValueError(f"Unit in --where does not fit {', '.join(cols)} ({self.columns[cols[0]]['dimension']} values)")
+            matched = set()
+            for col in usable:
+                data = self.columns[col]
+                end = (bisect_left if high_open else bisect_right)(data["lows"], high)
+                start = (bisect_right if low_open else bisect_left)(data["highs"], low)
+                matched |= set(data["low_docs"][:end]).intersection(data["high_docs"][start:])
+            allowed = matched if allowed is None else allowed & matched
+        return allowed
+
+
+def _ranked(bm25, query, max_results, docs=None, pool=None, shards=1):
+    """Doc ids of the top results; a query with no terms under a `docs` filter
+    (a pure range query) lists the rows that pass it in file order"""
+    hits = [idx for idx, _ in bm25.top(query, max_results, docs, pool, shards)]
+    if docs is not None and len(hits) < max_results and not bm25.tokenize(query):
+        chosen = set(hits)
+        hits.extend(islice((idx for idx in sorted(docs) if idx not in chosen), max_results - len(hits)))
+    return hits
+
+
+# ============ STREAMING INGESTION ============
+STREAMING_MIN_BYTES = 8 * 1024 * 1024  # files at least this large are indexed in chunks
+CHUNK_ROWS = 5000
+
+
+class _RecordParser(threading.local):
+    """One csv reader per thread, fed a record at a time.
+
+    Reusing the reader allocates its field buffer (16 KB) once per thread
+    instead of once per parsed record.
+    """
+
+    def __init__(self):
+        self.records = deque()
+        self.reader = csv.reader(iter(self.records.popleft, None))
+
+
+_record_parser = _RecordParser()
+
+
+def _parse_record(raw):
+    """Decode one raw CSV record (bytes) into its list of fields"""
+    parser = _record_parser
+    parser.records.append(raw.decode('utf-8'))
+    try:
+        return next(parser.reader)
+    except IndexError:  # blank, or a quoted field left open at the end of the file
+        return next(csv.reader(io.StringIO(raw.decode('utf-8'))), [])
+
+
+def _split_record(raw, last=None):
+    """Split one raw CSV record (bytes) without quotes into its fields, still encoded.
+
+    With `last`, only fields up to `last` are cut apart, so callers decode just
+    the fields they need. Returns None for a record containing quotes; parse
+    those with _parse_record.
+    """
+    if b'"' in raw:
+        return None
+    return raw.rstrip(b'\r\n').split(b',', -1 if last is None else last + 1)
+
+
+def _ends_quoted(line, quoted):
+    """Whether a physical CSV line ends inside a quoted field.
+
+    Follows the csv module: a quote opens a quoted field only at the start of a
+    field, `""` inside one is a literal quote and a lone `"` closes it. Quotes
+    anywhere else, like the inch mark in `Phone 6.1" screen`, are plain text.
+    """
+    pos = 0
+    while True:
+        pos = line.find(b'"', pos)
+        if pos < 0:
+            return quoted
+        if quoted:
+            if line[pos + 1:pos + 2] == b'"':
+                pos += 2
+                continue
+            quoted = False
+        elif pos == 0 or line[pos - 1:pos] == b',':
+            quoted = True
+        pos += 1
+
+
+def iter_csv_records(filepath):
+    """Stream (byte offset, byte length, fields) for every record of a CSV file.
+
+    The header is the first record. Physical lines are rejoined while a quoted
+    field is still open (see _ends_quoted), so multi-line values parse correctly
+    and offsets stay exact.
+    """
+    with open(filepath, 'rb') as f:
+        offset = 0
+        start = 0
+        pending = []
+        quoted = False
+        for line in f:
+            if not pending:
+                start = offset
+            offset += len(line)
+            pending.append(line)
+            quoted = _ends_quoted(line, quoted)
+            if quoted:
+                continue
+            raw = b"".join(pending)
+            pending = []
+            fields = _parse_record(raw)
+            if fields:
+                yield start, len(raw), fields
+        if pending:
+            raw = b"".join(pending)
+            fields = _parse_record(raw)
+            if fields:
+                yield start, len(raw), fields
+
+
+def read_source(filepath, config):
+    """Start reading a domain or stack CSV: (header, name position, remaining records).
+
+    Rows are named by the config's `name_col`, else its first output column;
+    a header without that column names rows by their first field.
+    """
+    records = iter_csv_records(filepath)
+    header = next(records, (0, 0, []))[2]
+    name_col = config.get("name_col", config["output_cols"][0])
+    return header, header.index(name_col) if name_col in header else 0, records
+
+
+def _map_bounded(func, items, workers):
+    """Map func over items in a process pool, yielding results in input order.
+
+    At most two tasks per worker are in flight, so memory held for pending
+    input and output stays bounded however long `items` is.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    # Imported here: loading multiprocessing costs every cold start tens of ms
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Indexes spanning every domain and stack, keyed by bundle name
+GLOBAL_INDEXES = {"code": _CodeIndex, "api": _ApiIndex, "related": _RelatedGraph}
+
+
+# ============ DESIGN BRIEF RECIPES ============
+RECIPE_RESULTS = 2   # results kept per plan step
+RECIPE_WORKERS = 8   # threads running plan steps
+
+# Stack searched when a brief names a platform but no stack
+PLATFORM_STACKS = {"ios": "swiftui", "android": "jetpack-compose", "cross-platform": "flutter"}
+
+# Terms added to platform-sensitive queries; every domain searches its Platform column
+PLATFORM_TERMS = {"ios": "ios", "android": "android material", "cross-platform": "cross-platform"}
+
+# (step, domain, query template) run for every brief, in output order; component
+# and stack steps are added per brief. Templates are filled with the brief's
+# {style} keywords, {elements} and {platform} terms.
+RECIPE_PLAN = [
+    ("style", "style", "{style} {platform}"),
+    ("color", "color", "{style} {platform}"),
+    ("typography", "typography", "{platform} {style}"),
+    ("navigation", "navigation", "{elements} {platform}"),
+    ("accessibility", "accessibility", "{elements}"),
+]
+
+# Stack query for a brief with neither style nor elements: the platform terms,
+# else these general guideline terms
+RECIPE_STACK_TERMS = "layout state navigation"
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
 
-    data = _load_csv(filepath)
+def parse_elements(elements):
+    """Brief elements as a list: a comma-separated string or any iterable of names"""
+    if isinstance(elements, str):
+        elements = elements.split(",")
+    return [element.strip() for element in elements or () if element.strip()]
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+def recipe_plan(style="", platform=None, stack=None, elements=()):
+    """Expand a design brief into its query plan: [{"step", "domain" | "stack", "query"}].
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    One component query runs per element, and the stack (explicit, or the
+    platform's default in PLATFORM_STACKS) is searched for the elements and
+    style together, falling back to the platform terms or RECIPE_STACK_TERMS so
+    it always runs. Other steps whose query comes out empty are left out.
+    """
+    if platform is not None and platform not in PLATFORM_TERMS:
+        raise ValueError(f"Unknown platform: {platform}. Available: {', '.join(PLATFORM_TERMS)}")
+    stack = stack or PLATFORM_STACKS.get(platform)
+    if stack is not None and stack not in STACK_CONFIG:
+        raise ValueError(f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}")
+    elements = parse_elements(elements)
+    terms = {"style": style or "", "elements": " ".join(elements), "platform": PLATFORM_TERMS.get(platform, "")}
 
-    return results
+    plan = [{"step": step, "domain": domain, "query": template.format(**terms)} for step, domain, template in RECIPE_PLAN[:3]]
+    plan += [{"step": "component", "domain": "component", "query": element} for element in elements]
+    plan += [{"step": step, "domain": domain, "query": template.format(**terms)} for step, domain, template in RECIPE_PLAN[3:]]
+    if stack is not None:
+        query = f"{terms['elements']} {terms['style']}".strip() or terms["platform"] or RECIPE_STACK_TERMS
+        plan.append({"step": "stack", "stack": stack, "query": query})
+    for entry in plan:
+        entry["query"] = " ".join(entry["query"].split())
+    return [entry for entry in plan if entry["query"]]
+
+
+# ============ QUERY LOG AND RESULT CACHE ============
+QUERY_LOG_ENV = "UIUX_MOBILE_QUERY_LOG"  # JSONL query log path; logging is off unless set
+PREWARM_ENV = "UIUX_MOBILE_PREWARM"      # prewarm set (query_log.py analyze) loaded by new engines
+QUERY_LOG_MAX_BYTES = 1024 * 1024        # rotate the log past this size
+QUERY_LOG_BACKUPS = 3                    # rotated files kept: log.1 (newest) ... log.3
+RESULT_CACHE_SIZE = 128                  # search_file results kept per engine (LRU)
+PREWARM_FORMAT = 1
+
+
+def normalize_query(query):
+    """The BM25 tokens of a query, space-separated: queries that rank alike normalize alike"""
+    return " ".join(BM25.tokenize(query))
+
+
+def query_log_files(path, backups=QUERY_LOG_BACKUPS):
+    """Existing files of a rotated query log, oldest first"""
+    path = Path(path)
+    candidates = [path.with_name(f"{path.name}.{i}") for i in range(backups, 0, -1)] + [path]
+    return [candidate for candidate in candidates if candidate.exists()]
+
+
+class _QueryLog:
+    """Local JSONL query log, one object per line, rotated at max_bytes.
+
+    Lines are appended in single writes, so several processes may share a log.
+    A failed write is dropped rather than failing the search it describes.
+    """
+
+    def __init__(self, path, max_bytes=QUERY_LOG_MAX_BYTES, backups=QUERY_LOG_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def write(self, entry):
+        """Append one entry, rotating first if it would overflow the current file"""
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                try:
+                    size = self.path.stat().st_size
+                except FileNotFoundError:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    size = 0
+                if size and size + len(line) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+            except OSError:
+                pass
+
+    def _rotate(self):
+        """Shift log.N-1 -> log.N, ..., log -> log.1, dropping the oldest"""
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+class _ResultCache:
+    """Thread-safe LRU of search_file results.
+
+    Rows are stored pickled, so every get() returns new rows, nested `_matches`
+    and `related` included, that callers may tag or filter freely.
+    """
+
+    def __init__(self, capacity=RESULT_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Copies of the cached rows for `key`, or None"""
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(blob)
+
+    def put(self, key, rows):
+        """Cache rows under `key`, evicting the least recently used entries"""
+        blob = pickle.dumps(rows, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = blob
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ============ SEARCH ENGINE ============
+class _RowStore:
+    """Byte offset and length of every record of a CSV file.
+
+    Rows are never held in memory: read() reads the requested records through
+    one file handle kept open per store, and decodes only the requested columns.
+    """
+
+    def __init__(self, filepath, header):
+        self.filepath = filepath
+        self.header = header
+        self.columns = {col: pos for pos, col in enumerate(header)}
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        stat = os.stat(filepath)
+        self.stamp = (stat.st_size, stat.st_mtime_ns)
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __del__(self):
+        if getattr(self, "_fd", None) is not None:
+            os.close(self._fd)
+
+    def append(self, offset, length):
+        """Record the location of the next row"""
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def to_dict(self):
+        """Serialize offsets for the prebuilt index bundle"""
+        return {"size": self.stamp[0], "offsets": list(self.offsets), "lengths": list(self.lengths)}
+
+    @classmethod
+    def from_dict(cls, filepath, header, data):
+        """Restore a row store serialized with to_dict().
+
+        The bundle is only loaded for a CSV matching its checksum, so the file's
+        current modification time is taken as the one it was indexed at.
+        """
+        store = cls.__new__(cls)
+        store.filepath = filepath
+        store.header = header
+        store.columns = {col: pos for pos, col in enumerate(header)}
+        store.offsets = array('Q', data["offsets"])
+        store.lengths = array('I', data["lengths"])
+        store.stamp = (data["size"], os.stat(filepath).st_mtime_ns)
+        store._fd = None
+        store._lock = threading.Lock()
+        return store
+
+    def _pread(self, length, offset):
+        """Read `length` bytes at `offset` from the shared handle, opening it on first use"""
+        if self._fd is None:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self.filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        if hasattr(os, "pread"):
+            return os.pread(self._fd, length, offset)
+        with self._lock:  # no pread on Windows: seek and read must not interleave
+            os.lseek(self._fd, offset, os.SEEK_SET)
+            return os.read(self._fd, length)
+
+    def read(self, ids, cols):
+        """Rows `ids`, in that order, as dicts of the requested columns only.
+
+        Records are split only up to the last requested column and only the
+        requested fields are decoded. Offsets hold for the file as it was when
+        `stamp` was taken; SearchEngine rebuilds an index whose CSV has changed
+        before reading from it.
+        """
+        if not ids:
+            return []
+        wanted = [(col, self.columns[col]) for col in cols if col in self.columns]
+        last = max((pos for _, pos in wanted), default=-1)
+        rows = []
+        for idx in ids:
+            raw = self._pread(self.lengths[idx], self.offsets[idx])
+            fields = _split_record(raw, last)
+            if fields is None:
+                fields = _parse_record(raw)
+                rows.append({col: fields[pos] for col, pos in wanted if pos < len(fields)})
+            else:
+                rows.append({col: fields[pos].decode('utf-8') for col, pos in wanted if pos < len(fields)})
+        return rows
+
+
+class _CsvIndex:
+    """Search data for one CSV file: a BM25 model fitted on its search columns, a
+    numeric range index and a row store addressing every record by byte offset.
+
+    No rows are resident; search() reads back and decodes only the top hits.
+    """
+
+    streaming = False
+    prebuilt = False
+
+    def __init__(self, filepath, search_cols, numeric_cols=()):
+        started = time.perf_counter()
+        documents = self._scan(filepath, search_cols, numeric_cols)
+        self.bm25 = BM25()
+        self.bm25.fit(documents)
+        self.numeric.finalize()
+        self.build_seconds = time.perf_counter() - started
+
+    def _scan(self, filepath, search_cols, numeric_cols):
+        """Set up the row store and numeric index; returns a generator of each record's
+        search text that fills both as it is consumed"""
+        self.filepath = filepath
+        self.search_cols = tuple(search_cols)
+        self.numeric_cols = tuple(numeric_cols)
+        records = iter_csv_records(filepath)
+        header = next(records, None)
+        self.header = header[2] if header else []
+        self.store = _RowStore(filepath, self.header)
+        self.numeric = _NumericIndex(self.numeric_cols)
+        col_positions = [self.header.index(col) for col in search_cols if col in self.header]
+        numeric_positions = [(self.header.index(col), col) for col in self.numeric_cols if col in self.header]
+
+        def documents():
+            for offset, length, fields in records:
+                for pos, col in numeric_positions:
+                    if pos < len(fields):
+                        self.numeric.add(len(self.store), col, fields[pos])
+                self.store.append(offset, length)
+                yield " ".join(fields[i] for i in col_positions if i < len(fields))
+
+        return documents()
+
+    def to_dict(self):
+        """Serialize model, numeric columns and row offsets for the prebuilt index bundle"""
+        return {
+            "search_cols": list(self.search_cols),
+            "numeric": self.numeric.to_dict(),
+            "header": self.header,
+            "store": self.store.to_dict(),
+            "bm25": self.bm25.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, filepath, data):
+        """Restore an index from its bundle entry without re-reading the CSV"""
+        started = time.perf_counter()
+        index = cls.__new__(cls)
+        index.filepath = filepath
+        index.search_cols = tuple(data["search_cols"])
+        index.numeric = _NumericIndex.from_dict(data["numeric"])
+        index.numeric_cols = tuple(index.numeric.columns)
+        index.header = data["header"]
+        index.store = _RowStore.from_dict(filepath, index.header, data["store"])
+        index.bm25 = BM25.from_dict(data["bm25"])
+        index.prebuilt = True
+        index.build_seconds = time.perf_counter() - started
+        return index
+
+    def search(self, query, output_cols, max_results, highlight=False, row_ids=False, where=None, pool=None, shards=1):
+        """Return top rows with score > 0, read from the row store and projected onto output columns.
+
+        With highlight, each row carries `_matches`: the character spans of query
+        terms per output column, located in the decoded rows. With row_ids, it
+        carries `_row`, its position in the CSV. `where` conditions (see
+        parse_where) restrict rows through the numeric index. `pool` and
+        `shards` enable sharded scoring (see BM25.top).
+        """
+        docs = self.numeric.filter(where) if where else None
+        hits = _ranked(self.bm25, query, max_results, docs, pool, shards)
+        results = self.store.read(hits, output_cols)
+        query_terms = set(self.bm25.tokenize(query)) if highlight else None
+        for idx, result in zip(hits, results):
+            if highlight:
+                result["_matches"] = _query_spans(result, query_terms)
+            if row_ids:
+                result["_row"] = idx
+        return results
+
+
+class _StreamingCsvIndex(_CsvIndex):
+    """_CsvIndex over a large CSV, tokenized chunk by chunk across a process pool"""
+
+    streaming = True
+
+    def __init__(self, filepath, search_cols, workers=1, chunk_rows=CHUNK_ROWS, numeric_cols=()):
+        started = time.perf_counter()
+        documents = self._scan(filepath, search_cols, numeric_cols)
+        self.bm25 = BM25()
+
+        def chunks():
+            first_doc = 0
+            while True:
+                batch = list(islice(documents, chunk_rows))
+                if not batch:
+                    return
+                yield first_doc, batch
+                first_doc += len(batch)
+
+        for _, doc_lengths, postings in _map_bounded(_tokenize_chunk, chunks(), workers):
+            self.bm25.add_chunk(doc_lengths, postings)
+        self.bm25.finalize()
+        self.numeric.finalize()
+        self.build_seconds = time.perf_counter() - started
+
+
+def file_sha256(filepath):
+    """Hex SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_index(filepath, search_cols, workers=None, chunk_rows=CHUNK_ROWS, numeric_cols=()):
+    """Build a streaming BM25 index for a CSV file of any size.
+
+    Tokenization and postings construction are sharded across `workers`
+    processes (default: all cores) and merged in document order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return _StreamingCsvIndex(Path(filepath), search_cols, workers, chunk_rows, numeric_cols)
+
+
+class SearchEngine:
+    """Reusable search engine that owns a data directory and caches its indexes.
+
+    Domain and stack indexes are built lazily on first use. Builds are serialized
+    by a lock and published by swapping in a new dict, so queries against an
+    already loaded index never take the lock and may run from any number of threads.
+
+    Indexes of SHARD_MIN_DOCS rows or more are scored in `scoring_workers`
+    shards on a shared thread pool. The default is one shard per core on
+    free-threaded builds and serial scoring under the GIL, where threads
+    cannot score in parallel.
+
+    With backend="sqlite" (default: the UIUX_MOBILE_BACKEND environment variable,
+    else "memory"), domains and stacks are searched through the SQLite FTS5
+    database of sqlite_index.py instead; `where` filters still use the
+    in-memory indexes.
+
+    Results of the in-memory backend are kept in an LRU cache of `cache_size`
+    entries, keyed on each CSV's size and modification time. With `query_log`
+    (default: UIUX_MOBILE_QUERY_LOG), every search, search_stack and
+    search_multi_domain call is appended to a rotating JSONL log; `prewarm`
+    (default: UIUX_MOBILE_PREWARM) loads a prewarm set written by query_log.py
+    at startup, see prewarm().
+    """
+
+    def __init__(self, data_dir=None, workers=None, streaming_min_bytes=STREAMING_MIN_BYTES, scoring_workers=None, backend=None,
+                 cache_size=RESULT_CACHE_SIZE, query_log=None, prewarm=None):
+        self.data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+        self.backend = backend or os.environ.get(BACKEND_ENV) or "memory"
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {self.backend}. Available: {', '.join(BACKENDS)}")
+        self._sqlite = None
+        self.workers = workers
+        self.streaming_min_bytes = streaming_min_bytes
+        if scoring_workers is None:
+            scoring_workers = (os.cpu_count() or 1) if FREE_THREADED else 1
+        self.scoring_workers = scoring_workers
+        self._scoring_pool = None
+        self._cache = _ResultCache(cache_size) if cache_size and self.backend == "memory" else None
+        query_log = query_log or os.environ.get(QUERY_LOG_ENV)
+        self._query_log = _QueryLog(query_log) if query_log else None
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._manifest = None
+        self._globals = {}
+        self.prewarmed = {"indexes": 0, "queries": 0}
+        prewarm = prewarm or os.environ.get(PREWARM_ENV)
+        if prewarm:
+            self.prewarm(prewarm)
+
+    def _index(self, filepath, search_cols, stat=None):
+        """Return the cached index for a file, building it on first use and
+        rebuilding it when the file's size or modification time has changed"""
+        key = (str(filepath), tuple(search_cols))
+        if stat is None:
+            stat = filepath.stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        index = self._indexes.get(key)
+        if index is not None and index.store.stamp == stamp:
+            return index
+
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None or index.store.stamp != stamp:
+                numeric_cols = self._numeric_cols(filepath)
+                if stat.st_size >= self.streaming_min_bytes:
+                    index = build_index(filepath, search_cols, self.workers, numeric_cols=numeric_cols)
+                else:
+                    index = self._load_prebuilt(filepath, search_cols, numeric_cols) or _CsvIndex(filepath, search_cols, numeric_cols)
+                self._indexes = {**self._indexes, key: index}
+                self._builds += 1
+        return index
+
+    def _scoring(self, index):
+        """(pool, shards) for scoring an index: the shared scoring pool, created on
+        first use, for large indexes when scoring_workers > 1, else (None, 1)"""
+        if self.scoring_workers < 2 or index.bm25.N < SHARD_MIN_DOCS:
+            return None, 1
+        if self._scoring_pool is None:
+            with self._lock:
+                if self._scoring_pool is None:
+                    self._scoring_pool = ThreadPoolExecutor(max_workers=self.scoring_workers, thread_name_prefix="bm25-shard")
+        return self._scoring_pool, self.scoring_workers
+
+    def _source(self, filepath):
+        """(kind, name, config) of the domain or stack a data file belongs to, or None"""
+        relative = Path(self._relative(filepath)).as_posix()
+        for kind, name, config in iter_sources():
+            if config["file"] == relative:
+                return kind, name, config
+        return None
+
+    def _numeric_cols(self, filepath):
+        """Numeric columns configured for a data file (none for files outside the config)"""
+        source = self._source(filepath)
+        return tuple(source[2].get("numeric_cols", ())) if source else ()
+
+    def _sqlite_index(self):
+        """The SQLite FTS5 index over this engine's data directory, opened on first use"""
+        if self._sqlite is None:
+            with self._lock:
+                if self._sqlite is None:
+                    from sqlite_index import SqliteIndex
+                    self._sqlite = SqliteIndex(data_dir=self.data_dir)
+        return self._sqlite
+
+    def _load_manifest(self):
+        """Read the prebuilt bundle manifest once; an unusable manifest counts as none"""
+        if self._manifest is None:
+            manifest = {}
+            try:
+                with open(self.data_dir / INDEX_DIR_NAME / "manifest.json", 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("format") == BUNDLE_FORMAT:
+                    manifest = data
+            except (OSError, ValueError):
+                pass
+            self._manifest = manifest
+        return self._manifest
+
+    def _load_prebuilt(self, filepath, search_cols, numeric_cols=()):
+        """Load a file's index from the prebuilt bundle if its checksums match, else None"""
+        entry = self._load_manifest().get("files", {}).get(Path(self._relative(filepath)).as_posix())
+        if entry is None or entry.get("search_cols") != list(search_cols):
+            return None
+        if entry.get("numeric_cols", []) != list(numeric_cols):
+            return None
+        if file_sha256(filepath) != entry.get("sha256"):
+            return None
+        try:
+            raw = (self.data_dir / INDEX_DIR_NAME / entry["index"]).read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(raw).hexdigest() != entry.get("index_sha256"):
+            return None
+        return _CsvIndex.from_dict(filepath, json.loads(raw))
+
+    def _load_prebuilt_global(self, name):
+        """Load a cross-source index from the prebuilt bundle if every source CSV still matches"""
+        manifest = self._load_manifest()
+        entry = manifest.get("global", {}).get(name)
+        if entry is None:
+            return None
+        for source, file_entry in manifest.get("files", {}).items():
+            filepath = self.data_dir / source
+            if not filepath.exists() or file_sha256(filepath) != file_entry.get("sha256"):
+                return None
+        try:
+            raw = (self.data_dir / INDEX_DIR_NAME / entry["index"]).read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(raw).hexdigest() != entry.get("index_sha256"):
+            return None
+        return GLOBAL_INDEXES[name].from_dict(json.loads(raw))
+
+    def _global(self, name):
+        """Return a cross-source index (see GLOBAL_INDEXES), building it on first use"""
+        index = self._globals.get(name)
+        if index is None:
+            with self._lock:
+                index = self._globals.get(name)
+                if index is None:
+                    index = self._load_prebuilt_global(name) or GLOBAL_INDEXES[name](self.data_dir)
+                    self._globals = {**self._globals, name: index}
+                    self._builds += 1
+        return index
+
+    def search_code(self, query, scope=None, max_results=MAX_RESULTS):
+        """Look up API and implementation snippets by identifier, optionally within one domain or stack"""
+        if scope is not None and scope not in CSV_CONFIG and scope not in STACK_CONFIG:
+            return {"error": f"Unknown domain or stack: {scope}"}
+
+        results = self._global("code").search(query, scope, max_results)
+
+        return {
+            "domain": "code",
+            "scope": scope,
+            "query": query,
+            "count": len(results),
+            "results": results
+        }
+
+    def translate(self, api, target, max_results=MAX_RESULTS):
+        """Find the equivalent of a platform API on another platform via the API hash index"""
+        platform = PLATFORM_ALIASES.get(target, target)
+        if platform not in PLATFORM_API_COLS:
+            valid = ", ".join(list(PLATFORM_API_COLS) + list(PLATFORM_ALIASES))
+            return {"error": f"Unknown platform: {target}. Available: {valid}"}
+
+        results = self._global("api").translate(api, platform, max_results)
+
+        return {
+            "domain": "translate",
+            "query": api,
+            "to": platform,
+            "count": len(results),
+            "results": results
+        }
+
+    def search_file(self, filepath, search_cols, output_cols, query, max_results=MAX_RESULTS, highlight=False, related=False, where=None):
+        """Search a single CSV file using BM25.
+
+        With related, each row carries `related`: its nearest rows in other
+        domains and stacks, looked up in the precomputed related graph. `where`
+        ("duration<=250ms", or parsed conditions) keeps only rows whose numeric
+        columns fall in range; BM25 still ranks them.
+        """
+        filepath = Path(filepath)
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return []
+        if isinstance(where, str):
+            where = parse_where(where)
+        key = None
+        if self._cache is not None:
+            # Keyed on the file's size and mtime too: an edited CSV never serves
+            # stale rows, it misses and its index is rebuilt
+            conditions = tuple(tuple(condition) for condition in where) if where else None
+            key = (str(filepath), stat.st_size, stat.st_mtime_ns, tuple(search_cols), tuple(output_cols),
+                   normalize_query(query), max_results, bool(highlight), bool(related), conditions)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+        source = self._source(filepath) if self.backend == "sqlite" and not where else None
+        if source is not None and list(source[2]["search_cols"]) == list(search_cols):
+            results = self._sqlite_index().search(source[0], source[1], query, output_cols, max_results)
+            query_terms = set(BM25.tokenize(query))
+            for result in results:
+                row = result.pop("_row")
+                if highlight:
+                    result["_matches"] = _query_spans(result, query_terms)
+                if related:
+                    result["_row"] = row
+        else:
+            index = self._index(filepath, search_cols, stat)
+            pool, shards = self._scoring(index)
+            results = index.search(query, output_cols, max_results, highlight, related, where, pool, shards)
+        if related:
+            graph = self._global("related")
+            source_file = Path(self._relative(filepath)).as_posix()
+            for result in results:
+                row = result.pop("_row")
+                # Rows inserted into the SQLite backend are not in the graph
+                result["related"] = graph.related(source_file, row) if row is not None else []
+        if key is not None:
+            self._cache.put(key, results)
+        return results
+
+    def search(self, query, domain=None, max_results=MAX_RESULTS, highlight=False, related=False, where=None):
+        """Main search function with auto-domain detection"""
+        started = time.perf_counter()
+        where_spec = where if isinstance(where, str) else None
+        if isinstance(where, str):
+            where = parse_where(where)
+        if domain is None:
+            domain = (where and detect_where_domain(where)) or detect_domain(query)
+
+        config = CSV_CONFIG.get(domain, CSV_CONFIG["component"])
+        filepath = self.data_dir / config["file"]
+
+        if not filepath.exists():
+            return {"error": f"File not found: {filepath}", "domain": domain}
+
+        results = self.search_file(filepath, config["search_cols"], config["output_cols"], query, max_results, highlight, related, where)
+        self._log("search", query, domain, started, len(results), max_results, highlight, related, where_spec)
+
+        return {
+            "domain": domain,
+            "query": query,
+            "file": config["file"],
+            "count": len(results),
+            "results": results
+        }
+
+    def search_stack(self, query, stack, max_results=MAX_RESULTS, highlight=False, related=False, where=None):
+        """Search stack-specific guidelines"""
+        started = time.perf_counter()
+        if stack not in STACK_CONFIG:
+            return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+
+        filepath = self.data_dir / STACK_CONFIG[stack]["file"]
+
+        if not filepath.exists():
+            return {"error": f"Stack file not found: {filepath}", "stack": stack}
+
+        results = self.search_file(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, highlight, related, where)
+        self._log("search_stack", query, stack, started, len(results), max_results, highlight, related, where if isinstance(where, str) else None)
+
+        return {
+            "domain": "stack",
+            "stack": stack,
+            "query": query,
+            "file": STACK_CONFIG[stack]["file"],
+            "count": len(results),
+            "results": results
+        }
+
+    def search_multi_domain(self, query, domains, max_results=MAX_RESULTS, platform=None, highlight=False, related=False, where=None):
+        """Search across multiple domains.
+
+        With `where`, domains lacking the filtered numeric columns are skipped;
+        the filter error is raised only if no domain has them.
+        """
+        started = time.perf_counter()
+        all_results = []
+        where_spec = where if isinstance(where, str) else None
+        if isinstance(where, str):
+            where = parse_where(where)
+        where_error = None
+        searched = 0
+
+        for domain in domains:
+            if domain not in CSV_CONFIG:
+                continue
+
+            config = CSV_CONFIG[domain]
+            filepath = self.data_dir / config["file"]
+
+            if not filepath.exists():
+                continue
+
+            try:
+                results = self.search_file(filepath, config["search_cols"], config["output_cols"], query, max_results, highlight, related, where)
+            except ValueError as exc:
+                where_error = exc
+                continue
+            searched += 1
+
+            # Add domain tag to results
+            for r in results:
+                r["_domain"] = domain
+
+            all_results.extend(results)
+
+        if where_error is not None and not searched:
+            raise where_error
+
+        # Filter by platform if specified
+        if platform:
+            all_results = filter_by_platform(all_results, platform)
+
+        # Sort by BM25 score would require re-scoring, so just interleave for now
+        # Return top max_results
+        all_results = all_results[:max_results]
+        self._log("search_multi_domain", query, ",".join(domains), started, len(all_results), max_results, highlight, related, where_spec, platform)
+        return all_results
+
+    def _log(self, method, query, target, started, count, max_results, highlight, related, where, platform=None):
+        """Append one call to the query log, if enabled"""
+        if self._query_log is None:
+            return
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": method,
+            "query": normalize_query(query),
+            "target": target,
+            "max_results": max_results,
+            "highlight": bool(highlight),
+            "related": bool(related),
+            "where": where,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+            "count": count,
+        }
+        if platform:
+            entry["platform"] = platform
+        self._query_log.write(entry)
+
+    def prewarm(self, spec):
+        """Load a prewarm set (a path, or the dict query_log.py writes) into this engine.
+
+        Its indexes are built and its queries run once so their results sit in
+        the result cache before the first request; calls made here are not
+        logged. A missing or unusable prewarm set counts as empty. Returns
+        {"indexes": n, "queries": n}, also kept as `prewarmed`.
+        """
+        if not isinstance(spec, dict):
+            try:
+                with open(spec, 'r', encoding='utf-8') as f:
+                    spec = json.load(f)
+            except (OSError, ValueError):
+                spec = {}
+        if spec.get("format") != PREWARM_FORMAT:
+            spec = {}
+
+        indexes = 0
+        for name in spec.get("indexes", ()):
+            if name in CSV_CONFIG:
+                config = CSV_CONFIG[name]
+            elif name in STACK_CONFIG:
+                config = {**_STACK_COLS, **STACK_CONFIG[name]}
+            else:
+                continue
+            filepath = self.data_dir / config["file"]
+            if filepath.exists():
+                self._index(filepath, config["search_cols"])
+                indexes += 1
+
+        queries = 0
+        for entry in spec.get("queries", ()):
+            if entry.get("method") == "search_stack":
+                targets = [{**_STACK_COLS, **STACK_CONFIG[entry["target"]]}] if entry.get("target") in STACK_CONFIG else []
+            else:
+                targets = [CSV_CONFIG[name] for name in str(entry.get("target", "")).split(",") if name in CSV_CONFIG]
+            for config in targets:
+                filepath = self.data_dir / config["file"]
+                if not filepath.exists():
+                    continue
+                try:
+                    self.search_file(filepath, config["search_cols"], config["output_cols"], entry.get("query", ""),
+                                     entry.get("max_results", MAX_RESULTS), entry.get("highlight", False), entry.get("related", False), entry.get("where"))
+                except ValueError:
+                    continue
+            queries += bool(targets)
+
+        self.prewarmed = {"indexes": indexes, "queries": queries}
+        return self.prewarmed
+
+    def recipe(self, style="", platform=None, stack=None, elements=(), max_results=RECIPE_RESULTS, highlight=False, workers=RECIPE_WORKERS):
+        """Run a design brief's whole query plan (see recipe_plan) as one search.
+
+        Steps run concurrently on a thread pool over this engine's indexes.
+        Results come back in plan order, tagged with `_step` (the position of
+        their plan entry) and `_domain` or `_stack`; a row already returned by
+        an earlier step is dropped.
+        """
+        try:
+            plan = recipe_plan(style, platform, stack, elements)
+        except ValueError as exc:
+            return {"error": str(exc)}
+
+        def run(entry):
+            if "stack" in entry:
+                config = {**_STACK_COLS, **STACK_CONFIG[entry["stack"]]}
+            else:
+                config = CSV_CONFIG[entry["domain"]]
+            filepath = self.data_dir / config["file"]
+            if not filepath.exists():
+                return config, []
+            return config, self.search_file(filepath, config["search_cols"], config["output_cols"], entry["query"], max_results, highlight)
+
+        results = []
+        seen = set()
+        duplicates = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plan)))) as pool:
+            for step, (entry, (config, rows)) in enumerate(zip(plan, pool.map(run, plan))):
+                source = ("stack", entry["stack"]) if "stack" in entry else ("domain", entry["domain"])
+                name_col = config.get("name_col", config["output_cols"][0])
+                entry["count"] = 0
+                for row in rows:
+                    key = (source, row.get(name_col))
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    row["_step"] = step
+                    row[f"_{source[0]}"] = source[1]
+                    results.append(row)
+                    entry["count"] += 1
+
+        return {
+            "domain": "recipe",
+            "query": " ".join(part for part in (style, platform, stack, ", ".join(parse_elements(elements))) if part),
+            "brief": {"style": style, "platform": platform, "stack": stack or PLATFORM_STACKS.get(platform), "elements": parse_elements(elements)},
+            "plan": plan,
+            "duplicates": duplicates,
+            "count": len(results),
+            "results": results
+        }
+
+    def reload(self, name=None):
+        """Drop cached indexes (all, or one domain/stack) so they rebuild on next use.
+
+        Returns the number of indexes dropped.
+        """
+        if name is None:
+            filepath = None
+        elif name in CSV_CONFIG:
+            filepath = str(self.data_dir / CSV_CONFIG[name]["file"])
+        elif name in STACK_CONFIG:
+            filepath = str(self.data_dir / STACK_CONFIG[name]["file"])
+        else:
+            raise ValueError(f"Unknown domain or stack: {name}")
+
+        with self._lock:
+            if filepath is None:
+                kept = {}
+            else:
+                kept = {key: index for key, index in self._indexes.items() if key[0] != filepath}
+            dropped = len(self._indexes) - len(kept)
+            self._indexes = kept
+            self._manifest = None
+            # Cross-source indexes span every file, so any reload invalidates them
+            dropped += len(self._globals)
+            self._globals = {}
+        if self._cache is not None:
+            self._cache.clear()
+        if self._sqlite is not None:
+            if name is None:
+                self._sqlite.forget()
+            else:
+                self._sqlite.forget("domain" if name in CSV_CONFIG else "stack", name)
+        return dropped
+
+    def _relative(self, filepath):
+        """Path of a file relative to the data directory when it lives inside it"""
+        try:
+            return str(Path(filepath).relative_to(self.data_dir))
+        except ValueError:
+            return str(filepath)
+
+    def stats(self):
+        """Describe the indexes currently resident in this engine"""
+        indexes = self._indexes
+        return {
+            "data_dir": str(self.data_dir),
+            "backend": self.backend,
+            "builds": self._builds,
+            "loaded": len(indexes),
+            "scoring_workers": self.scoring_workers,
+            "free_threaded": FREE_THREADED,
+            "cache": {"entries": len(self._cache), "capacity": self._cache.capacity, "hits": self._cache.hits, "misses": self._cache.misses} if self._cache is not None else None,
+            "query_log": str(self._query_log.path) if self._query_log is not None else None,
+            "prewarmed": self.prewarmed,
+            "global": {name: len(index) for name, index in self._globals.items()},
+            "indexes": [
+                {
+                    "file": self._relative(index.filepath),
+                    "documents": index.bm25.N,
+                    "terms": len(index.bm25.idf),
+                    "streaming": index.streaming,
+                    "prebuilt": index.prebuilt,
+                    "build_ms": round(index.build_seconds * 1000, 2),
+                }
+                for index in indexes.values()
+            ],
+        }
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the shared default SearchEngine used by the module-level functions.
+
+    The engine is recreated if DATA_DIR has been reassigned since it was built.
+    """
+    global _default_engine
+    engine = _default_engine
+    if engine is None or engine.data_dir != DATA_DIR:
+        with _default_engine_lock:
+            if _default_engine is None or _default_engine.data_dir != DATA_DIR:
+                _default_engine = SearchEngine()
+            engine = _default_engine
+    return engine
+
+
+# ============ SEARCH FUNCTIONS ============
+def _search_csv(filepath, search_cols, output_cols, query, max_results):
+    """Core search function using BM25"""
+    return get_engine().search_file(filepath, search_cols, output_cols, query, max_results)
 
 
 def detect_domain(query):
@@ -242,6 +2067,14 @@ def detect_domain(query):
     return best if scores[best] > 0 else "component"
 
 
+def detect_where_domain(conditions):
+    """First domain whose numeric columns cover every --where field, or None"""
+    for domain, config in CSV_CONFIG.items():
+        if all(numeric_fields(condition[0], config.get("numeric_cols", ())) for condition in conditions):
+            return domain
+    return None
+
+
 def filter_by_platform(results, platform):
     """Filter results by platform (ios, android, cross-platform)"""
     if not platform:
@@ -265,76 +2098,31 @@ def filter_by_platform(results, platform):
     return filtered
 
 
-def search_multi_domain(query, domains, max_results=MAX_RESULTS, platform=None):
+def search_multi_domain(query, domains, max_results=MAX_RESULTS, platform=None, highlight=False, related=False, where=None):
     """Search across multiple domains"""
-    all_results = []
-
-    for domain in domains:
-        if domain not in CSV_CONFIG:
-            continue
-
-        config = CSV_CONFIG[domain]
-        filepath = DATA_DIR / config["file"]
-
-        if not filepath.exists():
-            continue
-
-        results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
-
-        # Add domain tag to results
-        for r in results:
-            r["_domain"] = domain
+    return get_engine().search_multi_domain(query, domains, max_results, platform, highlight, related, where)
 
-        all_results.extend(results)
 
-    # Filter by platform if specified
-    if platform:
-        all_results = filter_by_platform(all_results, platform)
-
-    # Sort by BM25 score would require re-scoring, so just interleave for now
-    # Return top max_results
-    return all_results[:max_results]
-
-
-def search(query, domain=None, max_results=MAX_RESULTS):
+def search(query, domain=None, max_results=MAX_RESULTS, highlight=False, related=False, where=None):
     """Main search function with auto-domain detection"""
-    if domain is None:
-        domain = detect_domain(query)
-
-    config = CSV_CONFIG.get(domain, CSV_CONFIG["component"])
-    filepath = DATA_DIR / config["file"]
-
-    if not filepath.exists():
-        return {"error": f"File not found: {filepath}", "domain": domain}
+    return get_engine().search(query, domain, max_results, highlight, related, where)
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
 
-    return {
-        "domain": domain,
-        "query": query,
-        "file": config["file"],
-        "count": len(results),
-        "results": results
-    }
+def search_stack(query, stack, max_results=MAX_RESULTS, highlight=False, related=False, where=None):
+    """Search stack-specific guidelines"""
+    return get_engine().search_stack(query, stack, max_results, highlight, related, where)
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
-    if stack not in STACK_CONFIG:
-        return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+def search_code(query, scope=None, max_results=MAX_RESULTS):
+    """Identifier-aware lookup over API and implementation columns"""
+    return get_engine().search_code(query, scope, max_results)
 
-    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
 
-    if not filepath.exists():
-        return {"error": f"Stack file not found: {filepath}", "stack": stack}
+def translate(api, target, max_results=MAX_RESULTS):
+    """Exact cross-platform API equivalence lookup"""
+    return get_engine().translate(api, target, max_results)
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
 
-    return {
-        "domain": "stack",
-        "stack": stack,
-        "query": query,
-        "file": STACK_CONFIG[stack]["file"],
-        "count": len(results),
-        "results": results
-    }
+def recipe(style="", platform=None, stack=None, elements=(), max_results=RECIPE_RESULTS, highlight=False):
+    """Run a design brief's query plan in one call"""
+    return get_engine().recipe(style, platform, stack, elements, max_results, highlight)
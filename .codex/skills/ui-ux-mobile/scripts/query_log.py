@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Mobile Query Log - turns the engine's query log into a cache prewarm set
+Usage: python query_log.py analyze <log> [--top <n>] [--min-hits <n>] [--output <prewarm.json>] [--json]
+
+Logging is opt-in and local: set UIUX_MOBILE_QUERY_LOG=<path> (or pass
+SearchEngine(query_log=...)) and every search, search_stack and
+search_multi_domain call is appended to that JSONL file, rotated at 1 MB.
+`analyze` reads the log with its rotated files, ranks repeated lookups by
+hits, and writes the hottest ones with their indexes as a prewarm set. Point
+UIUX_MOBILE_PREWARM (or SearchEngine(prewarm=...)) at that file and new
+engines build those indexes and cache those results before the first request.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from core import PREWARM_FORMAT, query_log_files
+
+
+# Fields that, together, identify one cacheable lookup
+QUERY_KEY = ("method", "query", "target", "max_results", "highlight", "related", "where", "platform")
+
+
+def read_log(path):
+    """Yield the entries of a query log and its rotated files, oldest first; bad lines are skipped"""
+    for filepath in query_log_files(path):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and "method" in entry:
+                    yield entry
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def analyze(entries, top=50, min_hits=2):
+    """Build a prewarm set from log entries.
+
+    Lookups are grouped by QUERY_KEY and ranked by hits, then by total time.
+    The `top` lookups seen at least `min_hits` times are kept, and `indexes`
+    lists the domains and stacks they touch, hottest first.
+    """
+    latencies = defaultdict(list)
+    for entry in entries:
+        latencies[tuple(entry.get(field) for field in QUERY_KEY)].append(entry.get("ms", 0))
+    total = sum(len(values) for values in latencies.values())
+
+    ranked = sorted(latencies.items(), key=lambda item: (-len(item[1]), -sum(item[1])))
+    queries = []
+    for key, values in ranked[:top]:
+        if len(values) < min_hits:
+            break
+        query = {field: value for field, value in zip(QUERY_KEY, key) if value is not None}
+        query.update({"hits": len(values), "p50_ms": percentile(values, 0.5), "total_ms": round(sum(values), 3)})
+        queries.append(query)
+
+    index_hits = Counter()
+    for query in queries:
+        for name in str(query.get("target", "")).split(","):
+            if name:
+                index_hits[name] += query["hits"]
+
+    return {
+        "format": PREWARM_FORMAT,
+        "logged": total,
+        "covered": sum(query["hits"] for query in queries),
+        "indexes": [name for name, _ in index_hits.most_common()],
+        "queries": queries,
+    }
+
+
+def format_prewarm(prewarm):
+    """Markdown summary of a prewarm set"""
+    share = prewarm["covered"] / prewarm["logged"] if prewarm["logged"] else 0
+    output = [f"## Prewarm set: {len(prewarm['queries'])} lookups, {len(prewarm['indexes'])} indexes"]
+    output.append(f"**Logged:** {prewarm['logged']} calls | **Covered:** {prewarm['covered']} ({share:.0%})\n")
+    if prewarm["queries"]:
+        output.append("| Hits | p50 (ms) | Method | Target | Query |")
+        output.append("|------|----------|--------|--------|-------|")
+        for query in prewarm["queries"]:
+            output.append(f"| {query['hits']} | {query['p50_ms']} | {query['method']} | {query.get('target', '')} | {query.get('query', '')} |")
+    return "\n".join(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI/UX Mobile Query Log")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    analyze_parser = sub.add_parser("analyze", help="Build a prewarm set of the hottest logged lookups")
+    analyze_parser.add_argument("log", type=Path, help="Query log path (rotated files next to it are read too)")
+    analyze_parser.add_argument("--top", type=int, default=50, help="Most lookups kept (default: 50)")
+    analyze_parser.add_argument("--min-hits", type=int, default=2, help="Skip lookups seen fewer times (default: 2)")
+    analyze_parser.add_argument("--output", "-o", type=Path, help="Write the prewarm set to this JSON file")
+    analyze_parser.add_argument("--json", action="store_true", help="Print the prewarm set as JSON")
+
+    args = parser.parse_args()
+    if args.command == "analyze":
+        if not query_log_files(args.log):
+            print(f"Error: no query log at {args.log}", file=sys.stderr)
+            sys.exit(1)
+        prewarm = analyze(read_log(args.log), args.top, args.min_hits)
+        if args.output:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(prewarm, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+        print(json.dumps(prewarm, indent=2, ensure_ascii=False) if args.json else format_prewarm(prewarm))
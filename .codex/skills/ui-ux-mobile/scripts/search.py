@@ -3,6 +3,11 @@
 """
 UI/UX Mobile Search - BM25 search engine for mobile UI/UX design guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--platform <platform>] [--format <format>] [-n <max>]
+       python search.py "<identifier>" --code [--domain <domain> | --stack <stack>]
+       python search.py --translate "<api>" --to <swiftui|compose|flutter|react-native>
+       python search.py --nearest-color "<hex>" [-n <max>]
+       python search.py --contrast ["<palette>"]
+       python search.py ["<style keywords>"] --recipe [--platform <platform>] [--stack <stack>] [--elements "button, tab bar"]
 
 Domains: style, color, typography, component, navigation, gesture, accessibility, animation,
          onboarding, forms, responsive, errors, tokens, spacing, loading, performance
@@ -12,12 +17,185 @@ Stacks: swiftui, jetpack-compose, flutter, react-native, kmp-compose, material3,
 Platforms: ios, android, cross-platform
 
 Formats: markdown (default), json, code-only, summary
+
+Budget: --budget <n> caps output at n bytes (or n tokens with a "t" suffix, e.g. 800t)
+
+Related: --related adds each result's nearest rows in other domains and stacks
+
+Recipe: --recipe runs a design brief's whole query plan (style, color, typography, one component
+        query per element, navigation, accessibility, stack) in one process and merges the results
+
+Where: --where "duration<=250ms" or "size between 14 and 22sp" filters numeric columns
+       (ms/s durations; sp/dp/pt sizes, compared as equal); combine conditions with commas
 """
 
 import argparse
 import json
 import sys
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack, search_multi_domain, filter_by_platform
+from bisect import bisect_right
+from core import (
+    CSV_CONFIG, AVAILABLE_STACKS, _STACK_COLS, MAX_RESULTS, PLATFORM_ALIASES, PLATFORM_API_COLS, RECIPE_RESULTS,
+    search, search_code, search_stack, search_multi_domain, filter_by_platform, translate, recipe,
+)
+
+
+SNIPPET_CHARS = 160  # longest field text shown in markdown output
+SNIPPET_LEAD = 40    # context kept before the first match of a snippet window
+
+
+def best_snippet(value, spans):
+    """Cut the SNIPPET_CHARS window holding the most matches and bold the matched terms.
+
+    `spans` are the sorted [start, end] offsets of query terms that the search
+    located in the decoded row (a row's `_matches`), so the text is not searched again here.
+    """
+    if len(value) <= SNIPPET_CHARS:
+        start = 0
+    elif spans:
+        ends = [end for _, end in spans]
+        best, best_count = 0, 0
+        for i, (span_start, _) in enumerate(spans):
+            limit = max(0, span_start - SNIPPET_LEAD) + SNIPPET_CHARS
+            count = bisect_right(ends, limit) - i
+            if count > best_count:
+                best, best_count = i, count
+        start = max(0, spans[best][0] - SNIPPET_LEAD)
+    else:
+        start = 0
+    end = min(len(value), start + SNIPPET_CHARS)
+
+    pieces = []
+    pos = start
+    for span_start, span_end in spans:
+        if span_start >= pos and span_end <= end:
+            pieces.append(value[pos:span_start])
+            pieces.append(f"**{value[span_start:span_end]}**")
+            pos = span_end
+    pieces.append(value[pos:end])
+    return ("..." if start > 0 else "") + "".join(pieces) + ("..." if end < len(value) else "")
+
+
+BYTES_PER_TOKEN = 4  # rough average for English text and code
+
+# Columns dropped first when packing output into a budget, most expendable first
+LOW_VALUE_COLS = ["Docs URL", "Example Apps", "Code Bad", "Measurement", "Testing Method", "Theme Support", "Letter Spacing", "Deep Linking", "related"]
+
+
+def parse_budget(spec):
+    """Parse --budget: bytes ("2000", "2000b") or approximate tokens ("500t", "500tok")"""
+    value = str(spec).strip().lower()
+    for suffix, factor in (("tokens", BYTES_PER_TOKEN), ("tok", BYTES_PER_TOKEN), ("t", BYTES_PER_TOKEN), ("b", 1)):
+        if value.endswith(suffix):
+            value, multiplier = value[:-len(suffix)], factor
+            break
+    else:
+        multiplier = 1
+    try:
+        budget = int(value) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid budget: {spec} (use bytes like 2000 or tokens like 500t)")
+    if budget < 1:
+        raise argparse.ArgumentTypeError(f"budget must be positive (got {spec})")
+    return budget
+
+
+def name_column(result, row):
+    """The column naming a row: its source's `name_col`, if it sets one"""
+    if row.get("_stack") or (result.get("domain") == "stack" and "_domain" not in row):
+        return _STACK_COLS["name_col"]
+    return CSV_CONFIG.get(row.get("_domain") or result.get("domain"), {}).get("name_col")
+
+
+def field_priority(row, name_col=None):
+    """Order a row's fields from most to least worth keeping under a budget.
+
+    The row's name (`name_col`, else its first column) leads, then columns with
+    the most query matches, then the rest in output order; LOW_VALUE_COLS
+    always come last.
+    """
+    matches = row.get("_matches", {})
+    keys = [key for key in row if not key.startswith('_')]
+    primary = [key for key in keys if key not in LOW_VALUE_COLS]
+    if name_col in primary:
+        primary.remove(name_col)
+        primary.insert(0, name_col)
+    rest = sorted(primary[1:], key=lambda key: -len(matches.get(key, [])))
+    low = sorted((key for key in keys if key in LOW_VALUE_COLS), key=LOW_VALUE_COLS.index, reverse=True)
+    return primary[:1] + rest + low
+
+
+def apply_budget(result, budget, render):
+    """Greedily pack the best results and fields into `budget` bytes of rendered output.
+
+    Pass one adds results in rank order with their non-low-value fields, most
+    relevant first; it stops at the first result whose name no longer fits.
+    Pass two spends what is left on LOW_VALUE_COLS of the packed results.
+    `count` keeps the number found; "elided" records how many results are shown
+    and how many results and fields were left out. Every candidate is measured
+    with that note included, so the output never exceeds the budget, except
+    that the top result's name is always shown.
+    """
+    rows = result["results"]
+    orders = [field_priority(row, name_column(result, row)) for row in rows]
+    kept = [set() for _ in rows]
+
+    def packed():
+        shown = [i for i, keys in enumerate(kept) if keys]
+        budgeted = {
+            **result,
+            "results": [{key: value for key, value in rows[i].items() if key in kept[i] or key.startswith('_')} for i in shown],
+        }
+        dropped_results = len(rows) - len(shown)
+        dropped_fields = sum(1 for i in shown for key in orders[i] if key not in kept[i])
+        if dropped_results or dropped_fields:
+            budgeted["elided"] = {"budget_bytes": budget, "shown": len(shown), "results": dropped_results, "fields": dropped_fields}
+        return budgeted
+
+    def try_add(i, key):
+        kept[i].add(key)
+        if len(render(packed()).encode('utf-8')) <= budget:
+            return True
+        kept[i].discard(key)
+        return False
+
+    for i, order in enumerate(orders):
+        if not order:
+            break
+        if not try_add(i, order[0]):
+            if i:
+                break
+            kept[i].add(order[0])  # the top result's name is shown even over budget
+        for key in order[1:]:
+            if key not in LOW_VALUE_COLS:
+                try_add(i, key)
+
+    for i, order in enumerate(orders):
+        if kept[i]:
+            for key in order:
+                if key in LOW_VALUE_COLS:
+                    try_add(i, key)
+
+    return packed()
+
+
+def format_elided(elided):
+    """One-line note on what a budget left out, in counts only"""
+    shown = elided["shown"]
+    found = shown + elided["results"]
+    fields = f"; {elided['fields']} field(s) elided" if elided["fields"] else ""
+    return f"_Showing {shown} of {found} results to fit {elided['budget_bytes']} bytes{fields}_"
+
+
+def format_json(result):
+    """Format results as JSON, without internal match offsets"""
+    if result.get("results"):
+        result = {**result, "results": [{key: value for key, value in row.items() if key != "_matches"} for row in result["results"]]}
+    return json.dumps(result, indent=2, ensure_ascii=False)
+
+
+def format_related(items):
+    """One line listing precomputed related rows with their source"""
+    return ", ".join(f"{item['Name']} [{item.get('_domain') or item.get('_stack', '')}]" for item in items) or "none"
 
 
 def format_output(result, output_format="markdown"):
@@ -25,12 +203,28 @@ def format_output(result, output_format="markdown"):
     if "error" in result:
         return f"Error: {result['error']}"
 
-    if output_format == "summary":
-        return format_summary(result)
+    if result.get("domain") == "code":
+        output = format_code_lookup(result)
+    elif result.get("domain") == "translate":
+        output = format_translation(result)
+    elif result.get("domain") == "nearest-color":
+        from color import format_nearest
+        output = format_nearest(result["query"], result["results"])
+    elif result.get("domain") == "contrast":
+        from color import format_contrast
+        output = format_contrast(result["query"], result["results"])
+    elif result.get("domain") == "recipe" and output_format == "markdown":
+        output = format_recipe(result)
+    elif output_format == "summary":
+        output = format_summary(result)
     elif output_format == "code-only":
-        return format_code_only(result)
+        output = format_code_only(result)
     else:
-        return format_markdown(result)
+        output = format_markdown(result)
+
+    if result.get("elided"):
+        output += "\n" + format_elided(result["elided"])
+    return output
 
 
 def format_markdown(result):
@@ -48,19 +242,50 @@ def format_markdown(result):
 
     if result.get("platform"):
         output.append(f"**Platform Filter:** {result['platform']}")
+    if result.get("where"):
+        output.append(f"**Where:** {result['where']}")
 
     output.append(f"**Source:** {result.get('file', 'multiple')} | **Found:** {result['count']} results\n")
 
     for i, row in enumerate(result['results'], 1):
         domain_tag = f" [{row.get('_domain', '')}]" if '_domain' in row else ""
         output.append(f"### Result {i}{domain_tag}")
+        matches = row.get('_matches', {})
         for key, value in row.items():
             if key.startswith('_'):
                 continue
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
-            output.append(f"- **{key}:** {value_str}")
+            if key == "related":
+                output.append(f"- **Related:** {format_related(value)}")
+                continue
+            output.append(f"- **{key}:** {best_snippet(str(value), matches.get(key, []))}")
+        output.append("")
+
+    return "\n".join(output)
+
+
+def format_recipe(result):
+    """Format a design brief's combined results, one section per plan step"""
+    brief = result["brief"]
+    output = []
+    output.append(f"## UI/UX Mobile Design Brief")
+    fields = [("Style", brief["style"]), ("Platform", brief["platform"]), ("Stack", brief["stack"]), ("Elements", ", ".join(brief["elements"]))]
+    output.append(" | ".join(f"**{label}:** {value}" for label, value in fields if value))
+    duplicates = f" ({result['duplicates']} duplicates dropped)" if result.get("duplicates") else ""
+    output.append(f"**Plan:** {len(result['plan'])} queries | **Found:** {result['count']} results{duplicates}\n")
+
+    for step, entry in enumerate(result["plan"]):
+        rows = [row for row in result["results"] if row.get("_step") == step]
+        if not rows:
+            continue
+        output.append(f"### {entry['step'].title()} [{entry.get('domain') or entry.get('stack')}]: {entry['query']}")
+        for row in rows:
+            matches = row.get('_matches', {})
+            keys = [key for key in row if not key.startswith('_')]
+            if not keys:
+                continue
+            output.append(f"- **{row[keys[0]]}**")
+            for key in keys[1:]:
+                output.append(f"  - {key}: {best_snippet(str(row[key]), matches.get(key, []))}")
         output.append("")
 
     return "\n".join(output)
@@ -101,6 +326,39 @@ def format_code_only(result):
 
     return "\n".join(output) if len(output) > 1 else "No code examples found"
 
+def format_code_lookup(result):
+    """Format code index hits as ready-to-use snippets"""
+    output = []
+    scope = f" | **Scope:** {result['scope']}" if result.get("scope") else ""
+    output.append(f"## Code Lookup: {result['query']}{scope}\n")
+
+    for row in result['results']:
+        source = row.get('_domain') or row.get('_stack') or ""
+        output.append(f"### {row.get('Name', 'Example')} [{source}]")
+        if "Column" in row and "Code" in row:
+            output.append(f"**{row['Column']}:** `{row['Code']}`")
+        output.append("")
+
+    return "\n".join(output) if len(output) > 1 else "No code matches found"
+
+
+def format_translation(result):
+    """Format API equivalences, one block per matching row"""
+    output = []
+    output.append(f"## API Translation: `{result['query']}` -> {result['to']}\n")
+
+    for row in result['results']:
+        source = row.get('_domain') or row.get('_stack') or ""
+        partial = " (partial match)" if row.get("Match") == "partial" else ""
+        output.append(f"### {row.get('Name', 'Result')} [{source}]{partial}")
+        for key, value in row.items():
+            if key not in ("Name", "Match") and not key.startswith('_'):
+                output.append(f"- **{key}:** `{value}`")
+        output.append("")
+
+    return "\n".join(output) if len(output) > 1 else f"No {result['to']} equivalent found for `{result['query']}`"
+
+
 def emit_error(payload, output_format):
     json_mode = output_format == "json"
     if json_mode:
@@ -114,27 +372,70 @@ def emit_error(payload, output_format):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI/UX Mobile Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", help="Search domain(s), comma-separated for multiple")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search")
-    parser.add_argument("--platform", "-p", choices=["ios", "android", "cross-platform"], help="Filter by platform")
+    parser.add_argument("--platform", "-p", choices=["ios", "android", "cross-platform"], help="Filter by platform (with --recipe: the brief's platform)")
     parser.add_argument("--format", "-f", choices=["markdown", "json", "code-only", "summary"], default="markdown", help="Output format")
-    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--max-results", "-n", type=int, help=f"Max results (default: {MAX_RESULTS}, or {RECIPE_RESULTS} per step with --recipe)")
     parser.add_argument("--json", action="store_true", help="Output as JSON (shortcut for --format json)")
+    parser.add_argument("--code", "-c", action="store_true", help="Identifier-aware lookup over API/implementation columns")
+    parser.add_argument("--translate", "-t", metavar="API", help="Find the equivalent of a platform API (use with --to)")
+    parser.add_argument("--to", choices=list(PLATFORM_API_COLS) + list(PLATFORM_ALIASES), help="Target platform for --translate")
+    parser.add_argument("--nearest-color", metavar="HEX", help="Palette roles perceptually closest to a hex colour (OKLab)")
+    parser.add_argument("--contrast", nargs="?", const="", metavar="PALETTE", help="WCAG contrast audit of palette role pairs (all palettes, or names containing PALETTE)")
+    parser.add_argument("--recipe", action="store_true", help="Run a design brief (query = style keywords, plus --platform, --stack, --elements) as one combined search")
+    parser.add_argument("--elements", "-e", help="Comma-separated UI elements for --recipe, e.g. \"button, tab bar\"")
+    parser.add_argument("--related", "-r", action="store_true", help="Attach related rows from other domains and stacks to each result")
+    parser.add_argument("--where", "-w", action="append", help="Numeric range filter, e.g. \"duration<=250ms\" or \"size between 14 and 22sp\" (repeatable)")
+    parser.add_argument("--budget", "-b", type=parse_budget, help="Max output size in bytes, or tokens with a t suffix (e.g. 800t)")
 
     args = parser.parse_args()
 
+    if args.translate is not None and not args.to:
+        parser.error("--translate requires --to")
+    if args.recipe and not (args.query or args.platform or args.stack or args.elements):
+        parser.error("--recipe needs style keywords, --platform, --stack or --elements")
+    if args.elements and not args.recipe:
+        parser.error("--elements requires --recipe")
+    lookup = args.translate is not None or args.nearest_color is not None or args.contrast is not None or args.recipe
+    if not lookup and args.query is None and (args.code or not args.where):
+        parser.error("the following arguments are required: query")
+
+    where = ", ".join(args.where) if args.where else None
+    query = args.query or ""
+
     # Handle format argument
     output_format = "json" if args.json else args.format
+    # Match offsets drive both markdown snippets and field ranking under a budget
+    highlight = output_format == "markdown" or args.budget is not None
 
+    if args.max_results is None:
+        args.max_results = RECIPE_RESULTS if args.recipe else MAX_RESULTS
     if args.max_results < 1:
         emit_error(f"--max-results must be >= 1 (got {args.max_results})", output_format)
         sys.exit(1)
 
-    # Stack search takes priority
+    # Translation, colour and code lookups, then stack search take priority
     try:
-        if args.stack:
-            result = search_stack(args.query, args.stack, args.max_results)
+        if args.translate is not None:
+            result = translate(args.translate, args.to, args.max_results)
+        elif args.nearest_color is not None:
+            # color.py loads NumPy when installed, so only colour lookups import it
+            from color import nearest_color
+            result = nearest_color(args.nearest_color, args.max_results)
+        elif args.contrast is not None:
+            from color import contrast_audit
+            result = contrast_audit(args.contrast or None)
+        elif args.recipe:
+            result = recipe(query, args.platform, args.stack, args.elements or (), args.max_results, highlight)
+        elif args.code:
+            if args.domain and args.domain not in CSV_CONFIG:
+                emit_error(f"Unknown domain: {args.domain}. --code accepts a single domain or --stack", output_format)
+                sys.exit(1)
+            result = search_code(args.query, args.stack or args.domain, args.max_results)
+        elif args.stack:
+            result = search_stack(query, args.stack, args.max_results, highlight, args.related, where)
         elif args.domain and "," in args.domain:
             # Multi-domain search
             domains = [d.strip() for d in args.domain.split(",")]
@@ -142,10 +443,10 @@ if __name__ == "__main__":
             if not valid_domains:
                 emit_error(f"No valid domains in: {args.domain}. Valid domains: {', '.join(CSV_CONFIG.keys())}", output_format)
                 sys.exit(1)
-            results = search_multi_domain(args.query, valid_domains, args.max_results, args.platform)
+            results = search_multi_domain(query, valid_domains, args.max_results, args.platform, highlight, args.related, where)
             result = {
                 "domains": valid_domains,
-                "query": args.query,
+                "query": query,
                 "platform": args.platform,
                 "count": len(results),
                 "results": results
@@ -154,7 +455,7 @@ if __name__ == "__main__":
             if args.domain and args.domain not in CSV_CONFIG:
                 emit_error(f"Unknown domain: {args.domain}. Valid domains: {', '.join(CSV_CONFIG.keys())}", output_format)
                 sys.exit(1)
-            result = search(args.query, args.domain, args.max_results)
+            result = search(query, args.domain, args.max_results, highlight, args.related, where)
             # Apply platform filter for single domain search
             if args.platform and result.get("results"):
                 result["results"] = filter_by_platform(result["results"], args.platform)
@@ -168,7 +469,15 @@ if __name__ == "__main__":
         emit_error(result, output_format)
         sys.exit(1)
 
+    if where and isinstance(result, dict):
+        result["where"] = where
+
     if output_format == "json":
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        render = format_json
     else:
-        print(format_output(result, output_format))
+        render = lambda payload: format_output(payload, output_format)
+
+    if args.budget is not None:
+        result = apply_budget(result, args.budget, render)
+
+    print(render(result))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Mobile Index Compiler - prebuilds the search indexes shipped with the skill
+Usage: python compile_index.py [--data-dir <dir>] [--version <version>]
+
+Writes one JSON index per domain and stack into <data-dir>/index/, plus the
+cross-source indexes in GLOBAL_INDEXES (code lookup, API translation, related
+rows) and a manifest.json recording the bundle format, the package version, the
+SHA-256 of every source CSV and of every index file. core.py only loads an index whose source checksum
+still matches, so a stale bundle is ignored, never trusted.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from core import BUNDLE_FORMAT, DATA_DIR, GLOBAL_INDEXES, INDEX_DIR_NAME, _CsvIndex, file_sha256, iter_sources
+
+
+def index_targets():
+    """(index file name, source CSV, search columns, numeric columns) for every domain and stack"""
+    for kind, name, config in iter_sources():
+        filename = f"{name}.json" if kind == "domain" else f"stack-{name}.json"
+        yield filename, config["file"], config["search_cols"], config.get("numeric_cols", ())
+
+
+def write_index(index_dir, name, index):
+    """Write one serialized index deterministically; returns its SHA-256"""
+    payload = json.dumps(index.to_dict(), ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    (index_dir / name).write_bytes(payload)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def compile_bundle(data_dir, version):
+    """Build every index under data_dir and write the bundle; returns the manifest"""
+    index_dir = data_dir / INDEX_DIR_NAME
+    index_dir.mkdir(parents=True, exist_ok=True)
+    for stale in index_dir.glob("*.json"):
+        stale.unlink()
+
+    files = {}
+    for name, source, search_cols, numeric_cols in index_targets():
+        filepath = data_dir / source
+        if not filepath.exists():
+            continue
+        files[source] = {
+            "sha256": file_sha256(filepath),
+            "search_cols": list(search_cols),
+            "numeric_cols": list(numeric_cols),
+            "index": name,
+            "index_sha256": write_index(index_dir, name, _CsvIndex(filepath, search_cols, numeric_cols)),
+        }
+
+    global_indexes = {}
+    for name, index_type in GLOBAL_INDEXES.items():
+        filename = f"global-{name}.json"
+        global_indexes[name] = {"index": filename, "index_sha256": write_index(index_dir, filename, index_type(data_dir))}
+
+    manifest = {"format": BUNDLE_FORMAT, "version": version, "files": files, "global": global_indexes}
+    with open(index_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI/UX Mobile Index Compiler")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Skill data directory (default: ../data)")
+    parser.add_argument("--version", default="dev", help="Package version recorded in the manifest")
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: data directory not found: {args.data_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    manifest = compile_bundle(args.data_dir, args.version)
+    print(f"Compiled {len(manifest['files'])} indexes into {args.data_dir / INDEX_DIR_NAME} (format {BUNDLE_FORMAT}, version {args.version})")
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Mobile SQLite Index - SQLite FTS5 storage backend for the search engine
+Usage: python sqlite_index.py build [--data-dir <dir>]
+       python sqlite_index.py search "<query>" (--domain <domain> | --stack <stack>) [--facet <col=value>] [--weight <col=w>] [-n <max>] [--json]
+       python sqlite_index.py insert (--domain <domain> | --stack <stack>) --file <rows.csv|rows.jsonl|->
+       python sqlite_index.py parity [-n <k>] [--min-overlap <ratio>]
+
+Every domain and stack is compiled into one database, <data-dir>/index/search.sqlite.
+Each source gets a rows table holding every CSV column, with the facet columns
+(FACET_COLS) indexed, and an FTS5 table over its search columns ranked with
+bm25() and optional per-column weights. The FTS5 columns hold the tokens the
+in-memory BM25 indexes (BM25.tokenize), so both see the same document lengths.
+Rankings differ only where FTS5's fixed k1 of 1.2 and its IDF formula do, and
+`parity` measures how far that goes.
+
+The engine uses this backend with SearchEngine(backend="sqlite") or
+UIUX_MOBILE_BACKEND=sqlite. A source is rebuilt when its CSV checksum changes.
+The database runs in WAL mode, so any number of processes can read while one
+writes. Rows added with insert() are searchable at once, until the source CSV
+changes and its tables are rebuilt.
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from core import (
+    BM25, CSV_CONFIG, DATA_DIR, INDEX_DIR_NAME, MAX_RESULTS, SQLITE_DB_NAME, STACK_CONFIG,
+    _CsvIndex, file_sha256, iter_csv_records, iter_sources,
+)
+
+
+# ============ CONFIGURATION ============
+SQLITE_FORMAT = 1  # PRAGMA user_version; a database of any other format is rebuilt
+
+# Columns indexed for exact (case-insensitive) filtering wherever a source has them
+FACET_COLS = ["Platform", "Severity", "Priority"]
+
+# Tokenizer agreeing with BM25.tokenize: \w+ runs (underscore included), case-folded, accents kept
+FTS_TOKENIZER = "unicode61 remove_diacritics 0 tokenchars '_'"
+
+# Queries run against every source by `parity`, on top of each row's name
+PARITY_QUERIES = [
+    "button", "glass effect", "dark mode", "screen reader contrast", "spring animation", "tablet layout",
+    "email validation", "skeleton", "color role", "density", "navigation bar", "state management",
+]
+
+
+def _quote(name):
+    """Quote an SQL identifier (CSV headers contain spaces and apostrophes)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _table_names(kind, name):
+    """(rows table, FTS table) of one domain or stack"""
+    slug = re.sub(r'\W', '_', name)
+    return f"rows_{kind}_{slug}", f"fts_{kind}_{slug}"
+
+
+def _fts_text(value):
+    """Normalized FTS5 column text: the tokens BM25 indexes, space-separated"""
+    return " ".join(BM25.tokenize(value))
+
+
+def _match_expression(query):
+    """FTS5 query matching any BM25 token of `query` (None when it has none).
+
+    Repeated tokens are kept, as in BM25 scoring, where each occurrence counts.
+    """
+    tokens = BM25.tokenize(query)
+    return " OR ".join(f'"{token}"' for token in tokens) or None
+
+
+def source_config(kind, name):
+    """Search config of a domain or stack, with the shared stack columns merged in"""
+    for source_kind, source_name, config in iter_sources():
+        if source_kind == kind and source_name == name:
+            return config
+    raise ValueError(f"Unknown {kind}: {name}")
+
+
+# ============ SQLITE INDEX ============
+class SqliteIndex:
+    """FTS5 index of every domain and stack in one SQLite database.
+
+    Connections are opened per thread. Sources are built on first use and
+    rebuilt when their CSV checksum changes; once checked, a source is not
+    hashed again by this object until forget() is called.
+    """
+
+    def __init__(self, db_path=None, data_dir=None):
+        self.data_dir = Path(data_dir) if data_dir is not None else DATA_DIR
+        self.db_path = Path(db_path) if db_path is not None else self.data_dir / INDEX_DIR_NAME / SQLITE_DB_NAME
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._fresh = {}  # (kind, name) -> source row
+
+    def _connection(self):
+        """This thread's connection, opened in WAL mode and migrated on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SQLITE_FORMAT:
+                self._reset(conn)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self, conn):
+        """Drop every table and recreate the sources catalogue"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SQLITE_FORMAT:
+                tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+                for table in tables:
+                    conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                conn.execute(
+                    "CREATE TABLE sources (kind TEXT, name TEXT, file TEXT, sha256 TEXT, search_cols TEXT,"
+                    " columns TEXT, csv_rows INTEGER, PRIMARY KEY (kind, name))"
+                )
+                conn.execute(f"PRAGMA user_version = {SQLITE_FORMAT}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _source(self, kind, name):
+        """Catalogue row of a source, (re)building its tables if its CSV changed"""
+        key = (kind, name)
+        source = self._fresh.get(key)
+        if source is not None:
+            return source
+
+        config = source_config(kind, name)
+        filepath = self.data_dir / config["file"]
+        if not filepath.exists():
+            raise ValueError(f"File not found: {filepath}")
+        sha = file_sha256(filepath)
+        conn = self._connection()
+        source = self._catalogue(conn, kind, name)
+        if source is None or source["sha256"] != sha or source["search_cols"] != config["search_cols"]:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have rebuilt it while we waited for the write lock
+                source = self._catalogue(conn, kind, name)
+                if source is None or source["sha256"] != sha or source["search_cols"] != config["search_cols"]:
+                    self._load(conn, kind, name, config, filepath, sha)
+                    source = self._catalogue(conn, kind, name)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        with self._lock:
+            self._fresh = {**self._fresh, key: source}
+        return source
+
+    @staticmethod
+    def _catalogue(conn, kind, name):
+        row = conn.execute("SELECT file, sha256, search_cols, columns, csv_rows FROM sources WHERE kind = ? AND name = ?", (kind, name)).fetchone()
+        if row is None:
+            return None
+        rows_table, fts_table = _table_names(kind, name)
+        return {
+            "kind": kind, "name": name, "file": row[0], "sha256": row[1],
+            "search_cols": json.loads(row[2]), "columns": json.loads(row[3]), "csv_rows": row[4],
+            "rows_table": rows_table, "fts_table": fts_table,
+        }
+
+    @staticmethod
+    def _load(conn, kind, name, config, filepath, sha):
+        """Replace a source's tables with the contents of its CSV (inside the caller's transaction)"""
+        rows_table, fts_table = _table_names(kind, name)
+        records = iter_csv_records(filepath)
+        columns = next(records, (0, 0, []))[2]
+        search_cols = [col for col in config["search_cols"] if col in columns]
+        search_pos = [columns.index(col) for col in search_cols]
+
+        conn.execute(f"DROP TABLE IF EXISTS {rows_table}")
+        conn.execute(f"DROP TABLE IF EXISTS {fts_table}")
+        conn.execute(f"CREATE TABLE {rows_table} (_id INTEGER PRIMARY KEY, {', '.join(_quote(col) + ' TEXT' for col in columns)})")
+        conn.execute(f"CREATE VIRTUAL TABLE {fts_table} USING fts5({', '.join(_quote(col) for col in search_cols)}, tokenize=\"{FTS_TOKENIZER}\")")
+        for col in FACET_COLS:
+            if col in columns:
+                conn.execute(f"CREATE INDEX {_quote(rows_table + '_' + col.lower())} ON {rows_table} ({_quote(col)} COLLATE NOCASE)")
+
+        rows = [(fields + [""] * (len(columns) - len(fields)))[:len(columns)] for _, _, fields in records]
+        conn.executemany(f"INSERT INTO {rows_table} VALUES (?, {', '.join('?' * len(columns))})", [(i, *row) for i, row in enumerate(rows)])
+        conn.executemany(
+            f"INSERT INTO {fts_table} (rowid, {', '.join(_quote(col) for col in search_cols)}) VALUES (?, {', '.join('?' * len(search_cols))})",
+            [(i, *(_fts_text(row[pos]) for pos in search_pos)) for i, row in enumerate(rows)],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, name, config["file"], sha, json.dumps(search_cols), json.dumps(columns), len(rows)),
+        )
+
+    def build(self):
+        """Build (or refresh) every domain and stack whose CSV exists; returns their names"""
+        built = []
+        for kind, name, config in iter_sources():
+            if (self.data_dir / config["file"]).exists():
+                self._source(kind, name)
+                built.append(name)
+        return built
+
+    def forget(self, kind=None, name=None):
+        """Re-check CSV checksums (of all sources, or one) on next use"""
+        with self._lock:
+            self._fresh = {} if name is None else {key: value for key, value in self._fresh.items() if key != (kind, name)}
+
+    def search(self, kind, name, query, output_cols=None, max_results=MAX_RESULTS, facets=None, weights=None):
+        """Top rows of a domain or stack ranked by FTS5 bm25(), as dicts of `output_cols`.
+
+        `facets` maps FACET_COLS to a value or list of values (case-insensitive
+        equality). `weights` maps search columns to bm25() weights (default 1.0).
+        Each row carries `_row`, its position in the CSV, or None for rows added
+        with insert(). With facets but no query terms, matching rows come back
+        in file order.
+        """
+        source = self._source(kind, name)
+        columns = source["columns"]
+        output_cols = [col for col in (output_cols or columns) if col in columns]
+        rows_table, fts_table = source["rows_table"], source["fts_table"]
+
+        conditions, params = [], []
+        for col, values in (facets or {}).items():
+            if col not in FACET_COLS or col not in columns:
+                raise ValueError(f"Not a facet of {name}: {col} (facets: {', '.join(c for c in FACET_COLS if c in columns)})")
+            values = [values] if isinstance(values, str) else list(values)
+            conditions.append(f"r.{_quote(col)} COLLATE NOCASE IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        select = ", ".join(f"r.{_quote(col)}" for col in output_cols)
+        match = _match_expression(query)
+        if match is not None:
+            weight_args = "".join(f", {float((weights or {}).get(col, 1.0))}" for col in source["search_cols"])
+            where = " AND ".join([f"{fts_table} MATCH ?"] + conditions)
+            sql = (f"SELECT r._id, {select} FROM {fts_table} JOIN {rows_table} r ON r._id = {fts_table}.rowid"
+                   f" WHERE {where} ORDER BY bm25({fts_table}{weight_args}), r._id LIMIT ?")
+            params = [match] + params
+        elif conditions:
+            sql = f"SELECT r._id, {select} FROM {rows_table} r WHERE {' AND '.join(conditions)} ORDER BY r._id LIMIT ?"
+        else:
+            return []
+
+        results = []
+        for row_id, *values in self._connection().execute(sql, params + [max_results]):
+            result = dict(zip(output_cols, values))
+            result["_row"] = row_id if row_id < source["csv_rows"] else None
+            results.append(result)
+        return results
+
+    def insert(self, kind, name, rows):
+        """Append rows (dicts keyed by CSV column) to a source; returns how many were added.
+
+        Missing columns are stored empty. The rows are searchable as soon as this
+        returns, from every process, but live only in the database.
+        """
+        source = self._source(kind, name)
+        columns = source["columns"]
+        search_cols = source["search_cols"]
+        conn = self._connection()
+        count = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in rows:
+                unknown = [key for key in row if key not in columns]
+                if unknown:
+                    raise ValueError(f"Unknown column(s) for {name}: {', '.join(unknown)}")
+                values = [str(row.get(col) or "") for col in columns]
+                cursor = conn.execute(f"INSERT INTO {source['rows_table']} ({', '.join(_quote(col) for col in columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+                conn.execute(
+                    f"INSERT INTO {source['fts_table']} (rowid, {', '.join(_quote(col) for col in search_cols)}) VALUES (?, {', '.join('?' * len(search_cols))})",
+                    [cursor.lastrowid] + [_fts_text(row.get(col) or "") for col in search_cols],
+                )
+                count += 1
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+
+# ============ PARITY ============
+def _overlap(a, b):
+    """Shared fraction of two top-k id lists (1.0 when both are empty)"""
+    if not a and not b:
+        return 1.0
+    return len(set(a) & set(b)) / max(len(a), len(b))
+
+
+def parity(index, k=5):
+    """Compare FTS5 rankings with the in-memory BM25 for every source.
+
+    Queries are PARITY_QUERIES plus every row's name. Returns one dict per
+    source: query count, mean top-k overlap, top-1 agreement, identical top-k
+    order, and `mismatched`, queries where the two disagree on how many rows
+    match at all (always a bug: both return rows matching any query token).
+    """
+    report = []
+    for kind, name, config in iter_sources():
+        filepath = index.data_dir / config["file"]
+        if not filepath.exists():
+            continue
+        memory = _CsvIndex(filepath, config["search_cols"])
+        name_col = config.get("name_col", config["output_cols"][0])
+        with open(filepath, 'r', encoding='utf-8') as f:
+            queries = PARITY_QUERIES + [row.get(name_col) or "" for row in csv.DictReader(f)]
+
+        overlaps, top1, exact, mismatched = [], 0, 0, []
+        for query in queries:
+            expected = [idx for idx, _ in memory.bm25.top(query, k)]
+            found = [row["_row"] for row in index.search(kind, name, query, [name_col], k)]
+            overlaps.append(_overlap(expected, found))
+            top1 += expected[:1] == found[:1]
+            exact += expected == found
+            if len(expected) != len(found):
+                mismatched.append(query)
+        report.append({
+            "source": name,
+            "queries": len(queries),
+            "overlap": round(sum(overlaps) / len(overlaps), 3),
+            "top1": round(top1 / len(queries), 3),
+            "exact": round(exact / len(queries), 3),
+            "mismatched": mismatched,
+        })
+    return report
+
+
+def format_parity(report, k):
+    """Markdown table of a parity report with overall means"""
+    output = [f"## FTS5 vs in-memory BM25 (top {k})\n"]
+    output.append("| Source | Queries | Top-k overlap | Top-1 agree | Same order | Count mismatches |")
+    output.append("|--------|---------|---------------|-------------|------------|------------------|")
+    for row in report:
+        output.append(f"| {row['source']} | {row['queries']} | {row['overlap']:.3f} | {row['top1']:.3f} | {row['exact']:.3f} | {len(row['mismatched'])} |")
+    queries = sum(row["queries"] for row in report) or 1
+    mean = lambda key: sum(row[key] * row["queries"] for row in report) / queries
+    output.append(f"\n**Overall:** overlap {mean('overlap'):.3f}, top-1 {mean('top1'):.3f}, same order {mean('exact'):.3f}")
+    return "\n".join(output)
+
+
+# ============ CLI ============
+def _pairs(specs, kind):
+    """Parse repeated COL=VALUE options into a dict (values of repeated columns become lists)"""
+    result = {}
+    for spec in specs or ():
+        col, sep, value = spec.partition("=")
+        if not sep:
+            raise ValueError(f"Expected COL=VALUE for {kind}, got: {spec}")
+        col, value = col.strip(), value.strip()
+        if col in result:
+            previous = result[col]
+            result[col] = (previous if isinstance(previous, list) else [previous]) + [value]
+        else:
+            result[col] = value
+    return result
+
+
+def read_rows(path):
+    """Rows to insert from a CSV with a header, or JSON Lines of objects ("-" for stdin)"""
+    stream = sys.stdin if str(path) == "-" else open(path, 'r', encoding='utf-8', newline='')
+    try:
+        text = stream.read()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if text.lstrip().startswith("{"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI/UX Mobile SQLite Index")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Skill data directory (default: ../data)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build", help="Compile every domain and stack into the database")
+
+    search = sub.add_parser("search", help="Search one domain or stack through FTS5")
+    search.add_argument("query", help="Search query")
+    search.add_argument("--facet", action="append", help="Facet filter COL=VALUE, e.g. Platform=iOS (repeatable)")
+    search.add_argument("--weight", action="append", help="bm25() weight COL=W for a search column (repeatable)")
+    search.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    search.add_argument("--json", action="store_true", help="Output JSON")
+
+    insert = sub.add_parser("insert", help="Append rows to one domain or stack")
+    insert.add_argument("--file", required=True, help="CSV with a header row, or JSON Lines; - for stdin")
+
+    for command in (search, insert):
+        target = command.add_mutually_exclusive_group(required=True)
+        target.add_argument("--domain", "-d", choices=list(CSV_CONFIG), help="Domain")
+        target.add_argument("--stack", "-s", choices=list(STACK_CONFIG), help="Stack")
+
+    check = sub.add_parser("parity", help="Compare FTS5 rankings with the in-memory BM25")
+    check.add_argument("-k", type=int, default=5, help="Ranks compared per query (default: 5)")
+    check.add_argument("--min-overlap", type=float, default=0.9, help="Fail below this mean top-k overlap (default: 0.9)")
+
+    args = parser.parse_args()
+    index = SqliteIndex(data_dir=args.data_dir)
+    try:
+        if args.command == "build":
+            built = index.build()
+            print(f"Compiled {len(built)} sources into {index.db_path}")
+        elif args.command == "search":
+            kind, name = ("domain", args.domain) if args.domain else ("stack", args.stack)
+            output_cols = source_config(kind, name)["output_cols"]
+            weights = {col: float(w) for col, w in _pairs(args.weight, "--weight").items()}
+            results = index.search(kind, name, args.query, output_cols, args.max_results, _pairs(args.facet, "--facet"), weights)
+            results = [{key: value for key, value in row.items() if key != "_row"} for row in results]
+            if args.json:
+                print(json.dumps({"query": args.query, kind: name, "count": len(results), "results": results}, indent=2, ensure_ascii=False))
+            else:
+                for i, row in enumerate(results, 1):
+                    print(f"### Result {i}")
+                    print("\n".join(f"- **{key}:** {value}" for key, value in row.items()) + "\n")
+        elif args.command == "insert":
+            kind, name = ("domain", args.domain) if args.domain else ("stack", args.stack)
+            print(f"Inserted {index.insert(kind, name, read_rows(args.file))} rows into {name}")
+        elif args.command == "parity":
+            report = parity(index, args.k)
+            print(format_parity(report, args.k))
+            failed = [row["source"] for row in report if row["mismatched"]]
+            overall = sum(row["overlap"] * row["queries"] for row in report) / (sum(row["queries"] for row in report) or 1)
+            if failed:
+                print(f"\nMatch counts differ in: {', '.join(failed)}", file=sys.stderr)
+            sys.exit(1 if failed or overall < args.min_overlap else 0)
+    except (ValueError, sqlite3.Error) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
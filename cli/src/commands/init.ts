@@ -36,6 +36,7 @@ export async function initCommand(options: Partial<InstallOptions>): Promise<voi
   const spinner = ora('Installing UI/UX Mobile skill...').start();
 
   try {
+    let indexed: boolean;
     if (aiType === 'all') {
       // Check for existing installations
       for (const ai of Object.keys(AI_FOLDERS) as Array<Exclude<AIType, 'all'>>) {
@@ -45,7 +46,7 @@ export async function initCommand(options: Partial<InstallOptions>): Promise<voi
         }
       }
 
-      extractAll(targetDir, options.force);
+      indexed = extractAll(targetDir, options.force);
       spinner.succeed('UI/UX Mobile skill installed for Claude and Codex.');
     } else {
       if (isSkillInstalled(targetDir, aiType) && !options.force) {
@@ -53,10 +54,16 @@ export async function initCommand(options: Partial<InstallOptions>): Promise<voi
         process.exit(1);
       }
 
-      extractSkill(targetDir, aiType, options.force);
+      indexed = extractSkill(targetDir, aiType, options.force);
       spinner.succeed(`UI/UX Mobile skill installed for ${aiType}.`);
     }
 
+    if (indexed) {
+      logger.success('Prebuilt search index verified.');
+    } else {
+      logger.warn('No verified prebuilt search index installed; indexes will be built on first search.');
+    }
+
     logger.info('');
     logger.success('Installation complete!');
     logger.info('');
@@ -48,8 +48,9 @@ export async function updateCommand(options: Partial<UpdateOptions>): Promise<vo
   const spinner = ora('Updating UI/UX Mobile skill...').start();
 
   try {
+    let indexed: boolean;
     if (aiType === 'all') {
-      extractAll(targetDir, true);
+      indexed = extractAll(targetDir, true);
       spinner.succeed('UI/UX Mobile skill updated for all installations.');
     } else {
       if (!isSkillInstalled(targetDir, aiType)) {
@@ -57,10 +58,16 @@ export async function updateCommand(options: Partial<UpdateOptions>): Promise<vo
         process.exit(1);
       }
 
-      extractSkill(targetDir, aiType, true);
+      indexed = extractSkill(targetDir, aiType, true);
       spinner.succeed(`UI/UX Mobile skill updated for ${aiType}.`);
     }
 
+    if (indexed) {
+      logger.success('Prebuilt search index verified.');
+    } else {
+      logger.warn('No verified prebuilt search index installed; indexes will be built on first search.');
+    }
+
     logger.success('Update complete!');
   } catch (error) {
     spinner.fail('Update failed.');
@@ -9,6 +9,9 @@ export const AI_FOLDERS: Record<Exclude<AIType, 'all'>, string> = {
 
 export const AI_SKILL_PATH = 'skills/ui-ux-mobile';
 
+// Prebuilt search index written by scripts/compile_index.py, relative to the skill folder
+export const INDEX_BUNDLE_PATH = 'data/index';
+
 export interface InstallOptions {
   ai: AIType;
   force?: boolean;
@@ -18,6 +21,24 @@ export interface UpdateOptions {
   ai: AIType;
 }
 
+export interface IndexBundleFile {
+  index: string;
+  index_sha256: string;
+}
+
+export interface IndexBundleEntry extends IndexBundleFile {
+  sha256: string;
+  search_cols: string[];
+  numeric_cols: string[];
+}
+
+export interface IndexBundleManifest {
+  format: number;
+  version: string;
+  files: Record<string, IndexBundleEntry>;
+  global?: Record<string, IndexBundleFile>;
+}
+
 export interface VersionInfo {
   version: string;
   date: string;
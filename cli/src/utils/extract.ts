@@ -1,7 +1,15 @@
-import { cpSync, mkdirSync, existsSync, rmSync } from 'node:fs';
-import { dirname, join } from 'node:path';
+import { createHash } from 'node:crypto';
+import { cpSync, mkdirSync, existsSync, readFileSync, rmSync } from 'node:fs';
+import { dirname, join, sep } from 'node:path';
 import { fileURLToPath } from 'node:url';
-import { AI_FOLDERS, AI_SKILL_PATH, type AIType } from '../types/index.js';
+import {
+  AI_FOLDERS,
+  AI_SKILL_PATH,
+  INDEX_BUNDLE_PATH,
+  type AIType,
+  type IndexBundleManifest,
+} from '../types/index.js';
+import { logger } from './logger.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
@@ -18,13 +26,66 @@ function runFs(action: () => void, context: string): void {
   }
 }
 
+function sha256File(path: string): string {
+  return createHash('sha256').update(readFileSync(path)).digest('hex');
+}
+
+// The bundle format a skill's core.py loads (its BUNDLE_FORMAT line), so the CLI never
+// keeps a copy of the constant that could drift from Python
+export function readBundleFormat(skillPath: string): number | null {
+  const corePath = join(skillPath, 'scripts', 'core.py');
+  if (!existsSync(corePath)) {
+    return null;
+  }
+  const match = /^BUNDLE_FORMAT\s*=\s*(\d+)/m.exec(readFileSync(corePath, 'utf-8'));
+  return match ? Number(match[1]) : null;
+}
+
+// Check a skill's prebuilt index against the CSVs it was compiled from and the format its
+// core.py loads. Returns why the bundle is unusable, or null when it checks out.
+export function indexBundleProblem(skillPath: string): string | null {
+  const bundleDir = join(skillPath, INDEX_BUNDLE_PATH);
+  const manifestPath = join(bundleDir, 'manifest.json');
+
+  let manifest: IndexBundleManifest;
+  try {
+    manifest = JSON.parse(readFileSync(manifestPath, 'utf-8')) as IndexBundleManifest;
+  } catch (error) {
+    return `Invalid prebuilt index manifest ${manifestPath}: ${formatFsError(error)}`;
+  }
+
+  const expected = readBundleFormat(skillPath);
+  if (manifest.format !== expected) {
+    return `Unsupported prebuilt index format ${manifest.format} (core.py loads ${expected ?? 'none'})`;
+  }
+
+  const indexFiles = [...Object.values(manifest.files), ...Object.values(manifest.global ?? {})];
+
+  for (const [source, entry] of Object.entries(manifest.files)) {
+    const sourcePath = join(skillPath, 'data', source);
+    if (!existsSync(sourcePath) || sha256File(sourcePath) !== entry.sha256) {
+      return `Prebuilt index is stale: checksum mismatch for data/${source}`;
+    }
+  }
+
+  for (const entry of indexFiles) {
+    const indexPath = join(bundleDir, entry.index);
+    if (!existsSync(indexPath) || sha256File(indexPath) !== entry.index_sha256) {
+      return `Prebuilt index is corrupt: checksum mismatch for ${INDEX_BUNDLE_PATH}/${entry.index}`;
+    }
+  }
+
+  return null;
+}
+
 // Assets are located relative to the compiled dist folder
 function getAssetsDir(): string {
   // When running from dist/, go up to cli/, then into assets/
   return join(__dirname, '..', '..', 'assets');
 }
 
-export function extractSkill(targetDir: string, ai: Exclude<AIType, 'all'>, force = false): void {
+// Copies the skill and returns whether a verified prebuilt index came with it
+export function extractSkill(targetDir: string, ai: Exclude<AIType, 'all'>, force = false): boolean {
   const assetsDir = getAssetsDir();
   const sourceSkillPath = join(assetsDir, AI_FOLDERS[ai], AI_SKILL_PATH);
   const targetSkillPath = join(targetDir, AI_FOLDERS[ai], AI_SKILL_PATH);
@@ -47,15 +108,32 @@ export function extractSkill(targetDir: string, ai: Exclude<AIType, 'all'>, forc
     runFs(() => rmSync(targetSkillPath, { recursive: true }), `Failed to remove existing skill at ${targetSkillPath}`);
   }
 
+  // Verify the prebuilt index before copying; a bad one is left out, like a stale bundle
+  // in Python, so search.py builds indexes from the CSVs instead
+  const bundleDir = join(sourceSkillPath, INDEX_BUNDLE_PATH);
+  const bundled = existsSync(join(bundleDir, 'manifest.json'));
+  const problem = bundled ? indexBundleProblem(sourceSkillPath) : null;
+  if (problem) {
+    logger.warn(`${problem}; skipping the prebuilt index for ${ai}.`);
+  }
+
   // Copy skill directory
   runFs(
-    () => cpSync(sourceSkillPath, targetSkillPath, { recursive: true }),
+    () =>
+      cpSync(sourceSkillPath, targetSkillPath, {
+        recursive: true,
+        filter: (src) => !problem || (src !== bundleDir && !src.startsWith(bundleDir + sep)),
+      }),
     `Failed to copy skill from ${sourceSkillPath} to ${targetSkillPath}`,
   );
+
+  return bundled && !problem;
 }
 
-export function extractAll(targetDir: string, force = false): void {
+export function extractAll(targetDir: string, force = false): boolean {
+  let indexed = true;
   for (const ai of Object.keys(AI_FOLDERS) as Array<Exclude<AIType, 'all'>>) {
-    extractSkill(targetDir, ai, force);
+    indexed = extractSkill(targetDir, ai, force) && indexed;
   }
+  return indexed;
 }